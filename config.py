@@ -13,6 +13,8 @@ class Config:
     # Model Configuration
     EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     LLM_MODEL = "microsoft/DialoGPT-medium"
+    # INT8 ONNX Runtime encoder on CPU-only machines; needs sentence-transformers[onnx]>=3.2
+    USE_ONNX_EMBEDDINGS = False
     
     # Data Paths
     DATA_PATH = "data/raw"
@@ -29,10 +31,17 @@ class Config:
     TOP_K_RESULTS = 5
     SIMILARITY_THRESHOLD = 0.3
     
+    # Vector Index (FAISS HNSW)
+    HNSW_M = 32
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = max(64, 8 * TOP_K_RESULTS)
+    
     # LLM Settings
     MAX_LENGTH = 1024
     TEMPERATURE = 0.3
     TOP_P = 0.9
+    QUANTIZATION = "nf4"  # LLM weights on GPU: "nf4", "int8" or "fp16"
+    USE_VLLM = True  # Serve the LLM through vLLM when installed and on GPU
     
     # UI Settings
     LANGUAGES = ["🌍 All Languages", "🇮🇳 Hindi", "🇬🇧 English", "🕉️ Sanskrit"]
@@ -6,11 +6,12 @@ Pre-generate embeddings for faster initialization
 
 import os
 import sys
-import json
+import hashlib
 import numpy as np
+import torch
 from pathlib import Path
 import argparse
-from tqdm import tqdm
+from collections import Counter
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
@@ -19,7 +20,7 @@ from data_loader import DharmicDataLoader
 from text_processor import TextProcessor
 from embeddings import EmbeddingManager
 from vector_store import VectorStore
-from utils import setup_logging, ensure_dir
+from utils import setup_logging, ensure_dir, save_json
 from config import Config
 
 logger = setup_logging()
@@ -27,7 +28,7 @@ logger = setup_logging()
 def main():
     parser = argparse.ArgumentParser(description="Generate embeddings for Kalki GPT")
     parser.add_argument("--force", action="store_true", help="Force regenerate even if embeddings exist")
-    parser.add_argument("--batch-size", type=int, default=32, help="Batch size for embedding generation")
+    parser.add_argument("--batch-size", type=int, default=256, help="Batch size for embedding generation")
     parser.add_argument("--output-dir", type=str, default=Config.EMBEDDINGS_PATH, help="Output directory for embeddings")
     
     args = parser.parse_args()
@@ -39,45 +40,65 @@ def main():
     ensure_dir(args.output_dir)
     
     # Check if embeddings already exist
-    embeddings_file = os.path.join(args.output_dir, "text_embeddings.npy")
+    embeddings_file = os.path.join(args.output_dir, "text_embeddings_i8.npy")
     if os.path.exists(embeddings_file) and not args.force:
         print("✅ Embeddings already exist. Use --force to regenerate.")
         return
     
     try:
-        # Load data
-        print("📚 Loading scripture texts...")
+        # Load and process data; texts are formatted lazily and chunked as
+        # they stream in, so the formatted list is never held alongside the chunks
+        print("📚 Loading and processing scripture texts...")
         data_loader = DharmicDataLoader(Config.DATA_PATH)
-        texts = data_loader.load_all_texts()
-        print(f"✅ Loaded {len(texts)} texts")
-        
-        # Process texts
-        print("🔄 Processing texts...")
         text_processor = TextProcessor()
-        processed_texts = text_processor.process_texts(texts)
+        processed_texts = text_processor.process_texts(data_loader.iter_all_texts())
         print(f"✅ Created {len(processed_texts)} text chunks")
         
         # Generate embeddings
         print("🧠 Generating embeddings...")
         embedding_manager = EmbeddingManager()
         
-        # Create embeddings in batches with progress bar
         text_list = [text.get("chunk_text", text["content"].get("text", "")) for text in processed_texts]
         
         model = embedding_manager.load_model()
-        embeddings = []
         
-        for i in tqdm(range(0, len(text_list), args.batch_size), desc="Creating embeddings"):
-            batch = text_list[i:i + args.batch_size]
-            batch_embeddings = model.encode(
-                batch,
-                show_progress_bar=False,
+        # Run on GPU in half precision when available
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = model.to(device)
+        if device == "cuda":
+            model = model.half()
+        print(f"   Using device: {device}")
+        
+        # Deduplicate repeated chunks (refrains, mantras) so each is encoded once
+        unique_positions = {}
+        unique_texts = []
+        dedup_index = np.empty(len(text_list), dtype=np.int64)
+        for i, text in enumerate(text_list):
+            signature = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+            position = unique_positions.get(signature)
+            if position is None:
+                position = unique_positions[signature] = len(unique_texts)
+                unique_texts.append(text)
+            dedup_index[i] = position
+        print(f"   Encoding {len(unique_texts)} unique of {len(text_list)} chunks")
+        
+        # Encode in length-sorted order so each batch pads to similar lengths;
+        # SentenceTransformers handles the batching internally
+        order = np.argsort([len(text) for text in unique_texts], kind="stable")
+        with torch.inference_mode():
+            sorted_embeddings = model.encode(
+                [unique_texts[i] for i in order],
+                batch_size=args.batch_size,
+                device=device,
+                show_progress_bar=True,
                 convert_to_numpy=True,
                 normalize_embeddings=True
             )
-            embeddings.extend(batch_embeddings)
         
-        embeddings_array = np.array(embeddings)
+        # Scatter back into original order, then expand duplicates
+        unique_embeddings = np.empty(sorted_embeddings.shape, dtype=np.float32)
+        unique_embeddings[order] = sorted_embeddings
+        embeddings_array = unique_embeddings[dedup_index]
         print(f"✅ Generated embeddings shape: {embeddings_array.shape}")
         
         # Save embeddings
@@ -97,16 +118,12 @@ def main():
             "embedding_dimension": embeddings_array.shape[1],
             "model_name": Config.EMBEDDING_MODEL,
             "batch_size": args.batch_size,
-            "collections": {}
+            "collections": dict(Counter(
+                text["metadata"].get("collection", "unknown") for text in processed_texts
+            ))
         }
         
-        # Collection statistics
-        for text in processed_texts:
-            collection = text["metadata"].get("collection", "unknown")
-            stats["collections"][collection] = stats["collections"].get(collection, 0) + 1
-        
-        with open(os.path.join(args.output_dir, "generation_stats.json"), "w") as f:
-            json.dump(stats, f, indent=2)
+        save_json(stats, os.path.join(args.output_dir, "generation_stats.json"))
         
         print("\n" + "=" * 40)
         print("🎉 Embedding generation completed successfully!")
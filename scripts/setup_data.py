@@ -6,12 +6,31 @@ Setup script to download and prepare DharmicData for Kalki GPT
 import os
 import sys
 import json
+import mmap
+import struct
 import subprocess
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 import requests
 import zipfile
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # ISA-L inflate and CRC32 use AVX2/AVX-512 kernels; used explicitly by
+    # _extract_member_batch, zipfile itself is left untouched
+    from isal import isal_zlib
+except ImportError:
+    isal_zlib = None  # Extract through zipfile and CPython's bundled zlib
+
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+VALIDATION_WORKERS = 16
+ARCHIVE_PATH = Path("data/cache/dharmic_data.zip")
+ARCHIVE_PART_PATH = Path("data/cache/dharmic_data.zip.part")
+# Not a .json file so the scripture loader never picks it up from data/
+ARCHIVE_META_PATH = Path("data/cache/dharmic_data.meta")
+# Validators of the response the .part file was started from
+ARCHIVE_PART_META_PATH = Path("data/cache/dharmic_data.part.meta")
 
 def setup_directories():
     """Create necessary directory structure"""
@@ -28,6 +47,30 @@ def setup_directories():
         Path(directory).mkdir(parents=True, exist_ok=True)
         print(f"✅ Created directory: {directory}")
 
+def copy_stream(source, target, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> int:
+    """Copy a binary stream through one reusable buffer, returning bytes copied"""
+    buffer = memoryview(bytearray(chunk_size))
+    copied = 0
+    while True:
+        n = source.readinto(buffer)
+        if not n:
+            return copied
+        target.write(buffer[:n])
+        copied += n
+
+def _write_validators(path: Path, headers) -> None:
+    """Record the ETag/Last-Modified of a response next to the archive"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified")
+        }, f)
+
+def _discard_partial_download() -> None:
+    """Remove a partial archive and the validators it was started from"""
+    ARCHIVE_PART_PATH.unlink(missing_ok=True)
+    ARCHIVE_PART_META_PATH.unlink(missing_ok=True)
+
 def download_dharmic_data():
     """Download DharmicData repository"""
     print("📥 Downloading DharmicData repository...")
@@ -35,12 +78,71 @@ def download_dharmic_data():
     repo_url = "https://github.com/bhavykhatri/DharmicData/archive/refs/heads/main.zip"
     
     try:
-        response = requests.get(repo_url, stream=True)
+        # Revalidate a cached archive instead of downloading it again
+        headers = {}
+        if ARCHIVE_PATH.exists() and ARCHIVE_META_PATH.exists():
+            meta = json.loads(ARCHIVE_META_PATH.read_bytes())
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        
+        # Resume an interrupted download from where it stopped. main.zip is
+        # regenerated on every upstream commit, so the range is conditional on
+        # the archive the partial file came from (If-Range); if it changed,
+        # the server sends the whole new archive instead of a 206
+        part_validator = None
+        if ARCHIVE_PART_PATH.exists() and ARCHIVE_PART_META_PATH.exists():
+            part_meta = json.loads(ARCHIVE_PART_META_PATH.read_bytes())
+            part_validator = part_meta.get("etag") or part_meta.get("last_modified")
+        if part_validator is None:
+            _discard_partial_download()  # Origin unknown, cannot resume safely
+        
+        resume_from = ARCHIVE_PART_PATH.stat().st_size if ARCHIVE_PART_PATH.exists() else 0
+        if resume_from:
+            print(f"↪️ Resuming download at {resume_from} bytes")
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = part_validator
+        
+        response = requests.get(repo_url, headers=headers, stream=True)
+        if response.status_code == 416:
+            # Partial file no longer matches the remote archive; start over
+            _discard_partial_download()
+            del headers["Range"], headers["If-Range"]
+            response = requests.get(repo_url, headers=headers, stream=True)
         response.raise_for_status()
         
-        with open("dharmic_data.zip", "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        if response.status_code == 304:
+            _discard_partial_download()
+            print("✅ DharmicData unchanged, using cached archive")
+            return True
+        
+        # Copy in 1 MiB blocks to keep Python iterations and writes low;
+        # a 206 continues the partial file, a full response rewrites it and
+        # records which archive the new partial file belongs to
+        ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        response.raw.decode_content = True
+        if response.status_code == 206:
+            mode = "ab"
+        else:
+            mode = "wb"
+            _write_validators(ARCHIVE_PART_META_PATH, response.headers)
+        with open(ARCHIVE_PART_PATH, mode) as f:
+            copy_stream(response.raw, f)
+        
+        # Never promote a truncated or spliced archive to the cache
+        try:
+            with zipfile.ZipFile(ARCHIVE_PART_PATH) as zip_ref:
+                bad_member = zip_ref.testzip()
+        except zipfile.BadZipFile as e:
+            bad_member = str(e)
+        if bad_member is not None:
+            _discard_partial_download()
+            print(f"❌ Downloaded archive is corrupt ({bad_member}); run setup again")
+            return False
+        
+        os.replace(ARCHIVE_PART_PATH, ARCHIVE_PATH)
+        os.replace(ARCHIVE_PART_META_PATH, ARCHIVE_META_PATH)
         
         print("✅ Downloaded DharmicData successfully")
         return True
@@ -49,38 +151,110 @@ def download_dharmic_data():
         print(f"❌ Error downloading DharmicData: {e}")
         return False
 
+class _MappedArchive(mmap.mmap):
+    """Read-only memory map usable as a ZipFile source"""
+    
+    def seekable(self):
+        return True
+
+# Members ISA-L can read directly; bzip2/lzma members go through zipfile
+ISAL_COMPRESS_TYPES = (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED)
+
+def _read_member_isal(mm: mmap.mmap, info: zipfile.ZipInfo) -> bytes:
+    """Inflate one deflated or stored member straight from the mapped archive with ISA-L"""
+    offset = info.header_offset
+    if mm[offset:offset + 4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {info.orig_filename}")
+    
+    # Data follows the 30-byte local header, its file name and extra field
+    name_length, extra_length = struct.unpack_from("<HH", mm, offset + 26)
+    start = offset + 30 + name_length + extra_length
+    data = mm[start:start + info.compress_size]
+    
+    if info.compress_type == zipfile.ZIP_DEFLATED:
+        data = isal_zlib.decompress(data, -15)  # Raw DEFLATE stream
+    
+    if isal_zlib.crc32(data) != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for {info.orig_filename}")
+    return data
+
+def _extract_member_batch(zip_path: str, members: List[zipfile.ZipInfo], target: str) -> int:
+    """Extract a batch of members through a private ZipFile handle"""
+    # ZipFile handles are not safe to share across threads, so each worker
+    # maps the archive itself; pages are shared through the OS page cache
+    with open(zip_path, "rb") as f, _MappedArchive(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            zipfile.ZipFile(mm, "r") as zip_ref:
+        root = os.path.realpath(target)
+        for info in members:
+            if isal_zlib is None or info.compress_type not in ISAL_COMPRESS_TYPES:
+                zip_ref.extract(info, target)
+                continue
+            
+            # Same guard as ZipFile.extract: never write outside target
+            destination = os.path.realpath(os.path.join(root, info.filename))
+            if not destination.startswith(root + os.sep):
+                raise zipfile.BadZipFile(f"Unsafe member path: {info.orig_filename}")
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            with open(destination, "wb") as out:
+                out.write(_read_member_isal(mm, info))
+    return len(members)
+
+def extract_zip_parallel(zip_path: str, target: str, strip_prefix: str = "",
+                         include: Optional[Tuple[str, ...]] = None) -> List[str]:
+    """Extract ZIP members using a thread pool and return their target-relative paths
+    
+    Only members under strip_prefix + one of include are extracted when include
+    is given, and strip_prefix is removed from the written paths.
+    """
+    wanted = tuple(strip_prefix + prefix for prefix in include) if include else (strip_prefix,)
+    
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        members = [
+            info for info in zip_ref.infolist()
+            if not info.is_dir() and info.filename.startswith(wanted)
+        ]
+    
+    # Rewrite paths so members land directly in target; open() still matches
+    # the local header against orig_filename
+    for info in members:
+        info.filename = info.filename[len(strip_prefix):]
+    
+    # Deal members largest-first so each worker inflates a similar byte count
+    members.sort(key=lambda info: info.file_size, reverse=True)
+    workers = max(1, min(len(members), os.cpu_count() or 1))
+    batches = [members[i::workers] for i in range(workers)]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda batch: _extract_member_batch(zip_path, batch, target), batches))
+    
+    return [info.filename for info in members]
+
 def extract_and_organize_data():
     """Extract and organize the downloaded data"""
     print("📂 Extracting and organizing data...")
     
     try:
-        with zipfile.ZipFile("dharmic_data.zip", "r") as zip_ref:
-            zip_ref.extractall("temp_data")
-        
-        # Move data to correct locations
-        source_dir = Path("temp_data/DharmicData-main")
         target_dir = Path("data/raw")
         
-        # Copy all scripture directories
+        # Extract only the scripture directories, straight into place
         scripture_dirs = [
             "AtharvaVeda", "Mahabharata", "Ramcharitmanas", 
             "Rigveda", "SrimadBhagvadGita", "ValmikiRamayana", "Yajurveda"
         ]
         
+        extracted = extract_zip_parallel(
+            str(ARCHIVE_PATH), str(target_dir),
+            strip_prefix="DharmicData-main/",
+            include=tuple(f"{dir_name}/" for dir_name in scripture_dirs)
+        )
+        found_dirs = {name.split("/", 1)[0] for name in extracted}
+        
         for dir_name in scripture_dirs:
-            source_path = source_dir / dir_name
-            target_path = target_dir / dir_name
-            
-            if source_path.exists():
-                shutil.copytree(source_path, target_path, dirs_exist_ok=True)
-                print(f"✅ Copied {dir_name}")
+            if dir_name in found_dirs:
+                print(f"✅ Extracted {dir_name}")
             else:
                 print(f"⚠️ Directory not found: {dir_name}")
         
-        # Cleanup
-        shutil.rmtree("temp_data")
-        os.remove("dharmic_data.zip")
-        
         print("✅ Data extraction completed")
         return True
         
@@ -88,6 +262,14 @@ def extract_and_organize_data():
         print(f"❌ Error extracting data: {e}")
         return False
 
+def _try_parse(json_file: Path) -> Tuple[Path, Optional[Exception]]:
+    """Parse one JSON file, returning the error if it is invalid"""
+    try:
+        json.loads(json_file.read_bytes())
+        return json_file, None
+    except (ValueError, OSError) as e:
+        return json_file, e
+
 def validate_data():
     """Validate the downloaded data"""
     print("🔍 Validating data...")
@@ -96,19 +278,25 @@ def validate_data():
     stats = {}
     total_files = 0
     
+    all_json_files = []
     for scripture_dir in data_dir.iterdir():
         if scripture_dir.is_dir():
             json_files = list(scripture_dir.glob("*.json"))
             stats[scripture_dir.name] = len(json_files)
             total_files += len(json_files)
-            
-            # Validate each JSON file
-            for json_file in json_files:
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        json.load(f)
-                except Exception as e:
-                    print(f"⚠️ Invalid JSON file: {json_file} - {e}")
+            all_json_files.extend(json_files)
+    
+    # Validate JSON files concurrently; reads dominate and release the GIL
+    with ThreadPoolExecutor(max_workers=VALIDATION_WORKERS) as executor:
+        invalid = [
+            f"⚠️ Invalid JSON file: {json_file} - {error}\n"
+            for json_file, error in executor.map(_try_parse, all_json_files)
+            if error is not None
+        ]
+    
+    # Report invalid files in one write instead of a print per file
+    if invalid:
+        sys.stdout.write("".join(invalid))
     
     print(f"✅ Validation complete:")
     for scripture, count in stats.items():
@@ -8,8 +8,9 @@ import os
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent / "src"))
@@ -17,8 +18,167 @@ sys.path.append(str(Path(__file__).parent.parent / "src"))
 from utils import setup_logging, load_json, save_json
 from config import Config
 
+try:
+    import ijson
+except ImportError:
+    ijson = None  # Fall back to loading whole documents
+
 logger = setup_logging()
 
+def scan_subdirs(path) -> List[os.DirEntry]:
+    """List subdirectories using the type info returned by readdir"""
+    with os.scandir(path) as it:
+        return [entry for entry in it if entry.is_dir(follow_symlinks=False)]
+
+def scan_json_files(path) -> List[os.DirEntry]:
+    """List JSON files without an extra stat per entry"""
+    with os.scandir(path) as it:
+        return [entry for entry in it if entry.name.endswith('.json') and entry.is_file()]
+
+def validate_file(file_path: Path, clean_out: Optional[Path] = None) -> Dict[str, Any]:
+    """Validate a single JSON file, writing a cleaned copy to clean_out if given"""
+    result = {
+        "is_valid": True,
+        "verse_count": 0,
+        "errors": [],
+        "warnings": []
+    }
+    
+    try:
+        # Array files only need a count and the first few items, so stream them
+        if clean_out is None and ijson is not None and _is_json_array(file_path):
+            return _validate_array_stream(file_path, result)
+        
+        data = load_json(str(file_path))
+        
+        if data is None:
+            result["is_valid"] = False
+            result["errors"].append("Failed to load JSON")
+            return result
+        
+        # Validate structure
+        verse_count = count_verses(data)
+        result["verse_count"] = verse_count
+        
+        if verse_count == 0:
+            result["warnings"].append("No verses found")
+        
+        # Check for required fields
+        if isinstance(data, list):
+            for i, item in enumerate(data[:5]):  # Check first 5 items
+                validate_verse_structure(item, i, result)
+        elif isinstance(data, dict):
+            validate_verse_structure(data, 0, result)
+        
+        # Clean from the same parse instead of reloading the file
+        if clean_out is not None:
+            save_json(clean_verses(data), str(clean_out))
+        
+    except Exception as e:
+        result["is_valid"] = False
+        result["errors"].append(f"Validation error: {str(e)}")
+    
+    return result
+
+def _is_json_array(file_path: Path) -> bool:
+    """Check whether the top-level JSON value is an array"""
+    with open(file_path, 'rb') as f:
+        head = f.read(64).lstrip(b'\xef\xbb\xbf \t\r\n')
+    return head.startswith(b'[')
+
+def _validate_array_stream(file_path: Path, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a top-level array item by item, keeping one verse in memory"""
+    verse_count = 0
+    try:
+        with open(file_path, 'rb') as f:
+            for verse in ijson.items(f, 'item'):
+                if verse_count < 5:  # Check first 5 items
+                    validate_verse_structure(verse, verse_count, result)
+                verse_count += 1
+    except ijson.JSONError:
+        result["is_valid"] = False
+        result["errors"].append("Failed to load JSON")
+        return result
+    
+    result["verse_count"] = verse_count
+    if verse_count == 0:
+        result["warnings"].append("No verses found")
+    
+    return result
+
+def _count_dict_verses(data: Dict[str, Any]) -> int:
+    if 'verses' in data:
+        return len(data['verses'])
+    elif 'shlokas' in data:
+        return len(data['shlokas'])
+    return 1
+
+_VERSE_COUNTERS = {list: len, dict: _count_dict_verses}
+
+def count_verses(data: Any) -> int:
+    """Count verses in data structure"""
+    counter = _VERSE_COUNTERS.get(type(data))
+    return counter(data) if counter else 0
+
+TEXT_FIELDS = frozenset(('sanskrit', 'hindi', 'english', 'text', 'sloka', 'translation'))
+
+def _validate_str_verse(verse: str, index: int, result: Dict[str, Any]):
+    if len(verse.strip()) == 0:
+        result["warnings"].append(f"Verse {index}: Empty content")
+
+def _validate_dict_verse(verse: Dict[str, Any], index: int, result: Dict[str, Any]):
+    # Check for text content; the set intersection finds present keys in C
+    has_text = any(verse[field] for field in TEXT_FIELDS.intersection(verse))
+    
+    if not has_text:
+        result["warnings"].append(f"Verse {index}: No text content found")
+
+_VERSE_VALIDATORS = {str: _validate_str_verse, dict: _validate_dict_verse}
+
+def validate_verse_structure(verse: Any, index: int, result: Dict[str, Any]):
+    """Validate structure of individual verse"""
+    validator = _VERSE_VALIDATORS.get(type(verse))
+    if validator is None:
+        result["warnings"].append(f"Verse {index}: Unexpected type {type(verse)}")
+        return
+    validator(verse, index, result)
+
+def _clean_list(data: List[Any]) -> List[Any]:
+    return [clean_verse(verse) for verse in data if verse]
+
+def _clean_dict(data: Dict[str, Any]) -> Any:
+    if 'verses' in data:
+        data['verses'] = _clean_list(data['verses'])
+    elif 'shlokas' in data:
+        data['shlokas'] = _clean_list(data['shlokas'])
+    else:
+        return clean_verse(data)
+    return data
+
+def _clean_dict_verse(verse: Dict[str, Any], _strip=str.strip) -> Dict[str, Any]:
+    # str.strip is bound once at definition time rather than looked up per value
+    return {key: _strip(value) if type(value) is str else value for key, value in verse.items()}
+
+def _identity(value: Any) -> Any:
+    return value
+
+# Dispatch on exact type: one dict lookup instead of an isinstance cascade per verse
+_DATA_CLEANERS = {list: _clean_list, dict: _clean_dict}
+_VERSE_CLEANERS = {str: str.strip, dict: _clean_dict_verse}
+
+def clean_verses(data: Any) -> Any:
+    """Clean verse data"""
+    return _DATA_CLEANERS.get(type(data), _identity)(data)
+
+def clean_verse(verse: Any) -> Any:
+    """Clean individual verse"""
+    return _VERSE_CLEANERS.get(type(verse), _identity)(verse)
+
+def _validate_one(task):
+    """Process pool worker: validate (and optionally clean) one file"""
+    collection_name, file_path, clean_out = task
+    return collection_name, Path(file_path).name, file_path, validate_file(Path(file_path), clean_out)
+
 class DataValidator:
     """Validate scripture data integrity"""
     
@@ -28,8 +188,8 @@ class DataValidator:
         self.warnings = []
         self.stats = {}
     
-    def validate_all(self) -> Dict[str, Any]:
-        """Validate all scripture collections"""
+    def validate_all(self, clean_output: Optional[str] = None) -> Dict[str, Any]:
+        """Validate all scripture collections, cleaning into clean_output if given"""
         print("🔍 Starting data validation...")
         
         results = {
@@ -41,13 +201,31 @@ class DataValidator:
             "warnings": []
         }
         
-        for collection_dir in self.data_path.iterdir():
-            if collection_dir.is_dir():
-                collection_result = self.validate_collection(collection_dir)
-                results["collections"][collection_dir.name] = collection_result
-                results["valid_files"] += collection_result["valid_files"]
-                results["invalid_files"] += collection_result["invalid_files"]
-                results["total_verses"] += collection_result["total_verses"]
+        # Gather files first, then parse them across processes
+        tasks = []
+        for collection_dir in scan_subdirs(self.data_path):
+            print(f"  📂 Validating {collection_dir.name}...")
+            results["collections"][collection_dir.name] = self._empty_collection_result()
+            
+            output_collection = None
+            if clean_output:
+                output_collection = Path(clean_output) / collection_dir.name
+                output_collection.mkdir(parents=True, exist_ok=True)
+            
+            tasks.extend(
+                (collection_dir.name, json_file.path,
+                 output_collection / json_file.name if output_collection else None)
+                for json_file in scan_json_files(collection_dir.path)
+            )
+        
+        with ProcessPoolExecutor() as pool:
+            for collection_name, file_name, file_path, file_result in pool.map(_validate_one, tasks, chunksize=32):
+                self._add_file_result(results["collections"][collection_name], file_name, file_path, file_result)
+        
+        for collection_result in results["collections"].values():
+            results["valid_files"] += collection_result["valid_files"]
+            results["invalid_files"] += collection_result["invalid_files"]
+            results["total_verses"] += collection_result["total_verses"]
         
         results["errors"] = self.errors
         results["warnings"] = self.warnings
@@ -56,154 +234,40 @@ class DataValidator:
     
     def validate_collection(self, collection_path: Path) -> Dict[str, Any]:
         """Validate a single collection"""
-        result = {
-            "valid_files": 0,
-            "invalid_files": 0,
-            "total_verses": 0,
-            "files": {}
-        }
+        result = self._empty_collection_result()
         
         print(f"  📂 Validating {collection_path.name}...")
         
-        for json_file in collection_path.glob("*.json"):
-            file_result = self.validate_file(json_file)
-            result["files"][json_file.name] = file_result
-            
-            if file_result["is_valid"]:
-                result["valid_files"] += 1
-            else:
-                result["invalid_files"] += 1
-            
-            result["total_verses"] += file_result["verse_count"]
+        for json_file in scan_json_files(collection_path):
+            file_result = validate_file(Path(json_file.path))
+            self._add_file_result(result, json_file.name, json_file.path, file_result)
         
         return result
     
-    def validate_file(self, file_path: Path) -> Dict[str, Any]:
-        """Validate a single JSON file"""
-        result = {
-            "is_valid": True,
-            "verse_count": 0,
-            "errors": [],
-            "warnings": []
+    def _empty_collection_result(self) -> Dict[str, Any]:
+        """Counters for one collection"""
+        return {
+            "valid_files": 0,
+            "invalid_files": 0,
+            "total_verses": 0,
+            "files": {}
         }
-        
-        try:
-            data = load_json(str(file_path))
-            
-            if data is None:
-                result["is_valid"] = False
-                result["errors"].append("Failed to load JSON")
-                return result
-            
-            # Validate structure
-            verse_count = self.count_verses(data)
-            result["verse_count"] = verse_count
-            
-            if verse_count == 0:
-                result["warnings"].append("No verses found")
-                self.warnings.append(f"{file_path}: No verses found")
-            
-            # Check for required fields
-            if isinstance(data, list):
-                for i, item in enumerate(data[:5]):  # Check first 5 items
-                    self.validate_verse_structure(item, file_path, i, result)
-            elif isinstance(data, dict):
-                self.validate_verse_structure(data, file_path, 0, result)
-            
-        except Exception as e:
-            result["is_valid"] = False
-            result["errors"].append(f"Validation error: {str(e)}")
-            self.errors.append(f"{file_path}: {str(e)}")
-        
-        return result
-    
-    def count_verses(self, data: Any) -> int:
-        """Count verses in data structure"""
-        if isinstance(data, list):
-            return len(data)
-        elif isinstance(data, dict):
-            if 'verses' in data:
-                return len(data['verses'])
-            elif 'shlokas' in data:
-                return len(data['shlokas'])
-            else:
-                return 1
-        else:
-            return 0
-    
-    def validate_verse_structure(self, verse: Any, file_path: Path, index: int, result: Dict[str, Any]):
-        """Validate structure of individual verse"""
-        if not isinstance(verse, (dict, str)):
-            result["warnings"].append(f"Verse {index}: Unexpected type {type(verse)}")
-            return
-        
-        if isinstance(verse, str):
-            if len(verse.strip()) == 0:
-                result["warnings"].append(f"Verse {index}: Empty content")
-            return
-        
-        # Check for text content
-        text_fields = ['sanskrit', 'hindi', 'english', 'text', 'sloka', 'translation']
-        has_text = any(field in verse and verse[field] for field in text_fields)
-        
-        if not has_text:
-            result["warnings"].append(f"Verse {index}: No text content found")
     
-    def clean_data(self, input_path: str, output_path: str):
-        """Clean and normalize data"""
-        print("🧹 Cleaning data...")
+    def _add_file_result(self, result: Dict[str, Any], file_name: str, file_path: str, file_result: Dict[str, Any]):
+        """Fold one file's validation result into collection and global state"""
+        result["files"][file_name] = file_result
         
-        Path(output_path).mkdir(parents=True, exist_ok=True)
+        if file_result["is_valid"]:
+            result["valid_files"] += 1
+        else:
+            result["invalid_files"] += 1
         
-        for collection_dir in Path(input_path).iterdir():
-            if collection_dir.is_dir():
-                output_collection = Path(output_path) / collection_dir.name
-                output_collection.mkdir(exist_ok=True)
-                
-                for json_file in collection_dir.glob("*.json"):
-                    self.clean_file(json_file, output_collection / json_file.name)
+        result["total_verses"] += file_result["verse_count"]
         
-        print("✅ Data cleaning completed")
-    
-    def clean_file(self, input_file: Path, output_file: Path):
-        """Clean individual file"""
-        try:
-            data = load_json(str(input_file))
-            if data is None:
-                return
-            
-            cleaned_data = self.clean_verses(data)
-            save_json(cleaned_data, str(output_file))
-            
-        except Exception as e:
-            logger.error(f"Error cleaning {input_file}: {e}")
-    
-    def clean_verses(self, data: Any) -> Any:
-        """Clean verse data"""
-        if isinstance(data, list):
-            return [self.clean_verse(verse) for verse in data if verse]
-        elif isinstance(data, dict):
-            if 'verses' in data:
-                data['verses'] = [self.clean_verse(verse) for verse in data['verses'] if verse]
-            elif 'shlokas' in data:
-                data['shlokas'] = [self.clean_verse(verse) for verse in data['shlokas'] if verse]
-            else:
-                return self.clean_verse(data)
-        return data
-    
-    def clean_verse(self, verse: Any) -> Any:
-        """Clean individual verse"""
-        if isinstance(verse, str):
-            return verse.strip()
-        elif isinstance(verse, dict):
-            cleaned = {}
-            for key, value in verse.items():
-                if isinstance(value, str):
-                    cleaned[key] = value.strip()
-                else:
-                    cleaned[key] = value
-            return cleaned
-        return verse
+        if file_result["verse_count"] == 0 and file_result["is_valid"]:
+            self.warnings.append(f"{file_path}: No verses found")
+        for error in file_result["errors"]:
+            self.errors.append(f"{file_path}: {error}")
     
     def generate_report(self, results: Dict[str, Any], output_file: str):
         """Generate validation report"""
@@ -253,16 +317,16 @@ def main():
     
     validator = DataValidator(args.input_dir)
     
-    # Validate data
-    results = validator.validate_all()
+    # Validate data, cleaning in the same pass if requested
+    clean_output = args.output_dir if args.clean else None
+    results = validator.validate_all(clean_output)
     
     # Generate report
     validator.generate_report(results, args.report)
     print(f"📄 Report saved to: {args.report}")
     
     # Clean data if requested
-    if args.clean and args.output_dir:
-        validator.clean_data(args.input_dir, args.output_dir)
+    if clean_output:
         print(f"🧹 Cleaned data saved to: {args.output_dir}")
     
     # Exit with appropriate code
@@ -2,17 +2,111 @@
 # src/data_loader.py - COMPLETE FILE FOR YOUR SETUP
 
 import streamlit as st
+import hashlib
 import json
+import mmap
 import os
+import pickle
+import re
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List
+from config import Config
+from src.utils import loads, dumps
+
+try:
+    import ijson
+    try:
+        ijson = ijson.get_backend('yajl2_c')
+    except ImportError:
+        pass  # Use whichever backend ijson picked
+except ImportError:
+    ijson = None
 
 # 🔧 DATA PATH CONFIGURATION
 DATA_DIR = "data"  # Your GitHub data folder
+CACHE_PREFIX = "scriptures_"
+# Bump when parsing or the cached dict's keys change, so caches from older
+# code are not reused
+CACHE_VERSION = 1
+FORMATTED_CACHE_PREFIX = "verses_"
+# Bump when _iter_rag_format, _extract_content_fields or the collection
+# keywords change, so formatted caches from older code are not reused
+FORMATTED_CACHE_VERSION = 1
+STREAM_PARSE_BYTES = 2_000_000  # Stream top-level arrays above this size
+PROGRESS_INTERVAL = 0.2  # Seconds between progress bar updates
+
+def _iter_json_files(root):
+    """Yield (folder, filename, path) for JSON files below root"""
+    # DirEntry type checks reuse readdir results instead of stat-ing each entry
+    folder_name = os.path.basename(root)
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+    
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_json_files(entry.path)
+        elif entry.name.endswith('.json'):
+            yield folder_name, entry.name, entry.path
+
+def _data_signature(json_files):
+    """Hash paths, sizes and mtimes so edited data invalidates the cache"""
+    digest = hashlib.blake2b(digest_size=16)
+    for _, _, file_path in json_files:
+        stat = os.stat(file_path)
+        digest.update(f"{file_path}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def _parse_json_file(file_path):
+    """Read and parse one JSON file"""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if ijson is not None and size > STREAM_PARSE_BYTES:
+            # Build large verse arrays item by item instead of holding the
+            # raw bytes and the parsed tree at the same time
+            if f.read(64).lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'['):
+                f.seek(0)
+                return list(ijson.items(f, 'item', use_float=True))
+            f.seek(0)
+        
+        if not size:
+            return loads(f.read())  # mmap cannot map an empty file
+        # orjson parses straight from the mapped pages, no bytes copy
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return loads(view)
+
+def _load_cached_data(cache_file):
+    """Load parsed scripture data from the disk cache"""
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+def _save_cached_data(cache_file, all_data, prefix=CACHE_PREFIX):
+    """Persist parsed scripture data, replacing stale cache files"""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(all_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+        
+        for stale in cache_file.parent.glob(f"{prefix}*.pkl"):
+            if stale != cache_file:
+                stale.unlink()
+    except OSError:
+        pass  # Read-only filesystem on Streamlit Cloud
 
-@st.cache_data
+@st.cache_resource(show_spinner=False)
 def load_all_scripture_data():
-    """Load scripture data from local GitHub files"""
+    """Load scripture data from local GitHub files
+    
+    The returned dict is shared by reference across sessions; do not mutate it.
+    """
     try:
         with st.spinner("📥 Loading sacred texts from GitHub..."):
             all_data = {}
@@ -22,64 +116,77 @@ def load_all_scripture_data():
                 st.error(f"❌ Data directory '{DATA_DIR}' not found in repository")
                 return {}
             
-            file_count = 0
-            total_files = 0
-            
-            # Count total files first
-            for root, dirs, files in os.walk(data_path):
-                total_files += len([f for f in files if f.endswith('.json')])
+            # Collect (folder, filename, path) for each JSON file once; plain
+            # strings avoid building a Path object per file
+            json_files = list(_iter_json_files(DATA_DIR))
+            total_files = len(json_files)
             
-            st.info(f"📚 Found {total_files} JSON files to process...")
+            # Reuse parsed data from disk if no file changed
+            cache_file = Path(Config.CACHE_PATH) / f"{CACHE_PREFIX}v{CACHE_VERSION}_{_data_signature(json_files)}.pkl"
+            cached = _load_cached_data(cache_file) if cache_file.exists() else None
+            if cached is not None:
+                all_data = cached
+                pending_files = []
+            else:
+                pending_files = json_files
+                st.info(f"📚 Found {total_files} JSON files to process...")
             
             # Load all JSON files
-            for root, dirs, files in os.walk(data_path):
-                folder_name = Path(root).name
+            file_count = 0
+            duplicate_counts = defaultdict(int)
+            progress_bar = st.progress(0.0) if pending_files else None
+            last_progress = time.monotonic()
+            # Parse files on a thread pool (orjson releases the GIL); keys,
+            # duplicates and st.* progress stay on this thread, in order
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                futures = [executor.submit(_parse_json_file, file_path) for _, _, file_path in pending_files]
                 
-                for file in files:
-                    if file.endswith('.json'):
-                        file_path = Path(root) / file
+                for (folder_name, file, _), future in zip(pending_files, futures):
+                    try:
+                        data = future.result()
                         
-                        try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                data = json.load(f)
-                            
-                            # Create key: foldername_filename
-                            clean_filename = file_path.stem
-                            if folder_name != DATA_DIR:
-                                key = f"{folder_name}_{clean_filename}"
-                            else:
-                                key = clean_filename
-                            
-                            # Handle duplicate keys
-                            original_key = key
-                            counter = 1
-                            while key in all_data:
-                                key = f"{original_key}_{counter}"
-                                counter += 1
-                            
-                            all_data[key] = data
-                            file_count += 1
+                        # Create key: foldername_filename
+                        clean_filename = file[:-5]  # Strip '.json'
+                        if folder_name != DATA_DIR:
+                            key = f"{folder_name}_{clean_filename}"
+                        else:
+                            key = clean_filename
+                        
+                        # Handle duplicate keys, resuming from the last suffix used
+                        original_key = key
+                        counter = duplicate_counts[original_key]
+                        while key in all_data:
+                            counter += 1
+                            key = f"{original_key}_{counter}"
+                        duplicate_counts[original_key] = counter
+                        
+                        all_data[key] = data
+                        file_count += 1
+                        
+                        # Show progress, throttled so the client isn't re-rendered per file
+                        now = time.monotonic()
+                        if now - last_progress >= PROGRESS_INTERVAL:
+                            progress_bar.progress(file_count / total_files, text=f"📖 {file_count}/{total_files} files")
+                            last_progress = now
                             
-                            # Show progress
-                            if file_count % 5 == 0 or file_count == total_files:
-                                progress = (file_count / total_files) * 100
-                                st.info(f"📖 Progress: {file_count}/{total_files} files ({progress:.0f}%)")
-                                
-                        except json.JSONDecodeError:
-                            st.warning(f"⚠️ Skipped invalid JSON: {file_path.name}")
-                            continue
-                        except Exception as e:
-                            st.warning(f"⚠️ Error loading {file_path.name}: {str(e)}")
-                            continue
+                    except json.JSONDecodeError:  # Also raised by orjson
+                        st.warning(f"⚠️ Skipped invalid JSON: {file}")
+                        continue
+                    except Exception as e:
+                        st.warning(f"⚠️ Error loading {file}: {str(e)}")
+                        continue
+            
+            if progress_bar is not None:
+                progress_bar.empty()
+            
+            if cached is None and all_data:
+                _save_cached_data(cache_file, all_data)
             
             if all_data:
                 st.success(f"✅ Successfully loaded {len(all_data)} scripture files!")
                 
                 # Show detailed collection summary
-                collections = {}
-                for key in all_data.keys():
-                    collection = get_collection_from_filename(key)
-                    collections[collection] = collections.get(collection, 0) + 1
+                collections = Counter(get_collection_from_filename(key) for key in all_data)
                 
                 # Display collection summary
                 st.markdown("### 📖 Loaded Collections:")
@@ -95,29 +202,89 @@ def load_all_scripture_data():
         st.error(f"❌ Error loading scripture data: {str(e)}")
         return {}
 
+# Collections in priority order; the first keyword found anywhere in the name wins
+COLLECTION_KEYWORDS = [
+    ('Ramcharitmanas', 'ramcharit'),
+    ('Valmiki Ramayana', 'valmiki'),
+    ('Ramayana', 'ramayan'),
+    ('Bhagavad Gita', 'bhagavad|gita'),
+    ('Mahabharata', 'mahabharata'),
+    ('Rigveda', 'rigveda|rig_veda'),
+    ('Yajurveda', 'yajurveda|yajur_veda'),
+    ('Atharvaveda', 'atharvaveda|atharva_veda'),
+]
+# One lookahead branch per collection keeps the priority order in a single
+# compiled search; lastgroup names the branch that matched
+COLLECTION_RE = re.compile(
+    '^(?:' + '|'.join(
+        f'(?=.*?(?:{keywords}))(?P<c{i}>)' for i, (_, keywords) in enumerate(COLLECTION_KEYWORDS)
+    ) + ')',
+    re.IGNORECASE | re.DOTALL
+)
+COLLECTION_BY_GROUP = {f'c{i}': name for i, (name, _) in enumerate(COLLECTION_KEYWORDS)}
+DEFAULT_COLLECTION = 'Sacred Texts'
+COLLECTION_KEYS = {
+    name: name.lower().replace(' ', '_')
+    for name in [name for name, _ in COLLECTION_KEYWORDS] + [DEFAULT_COLLECTION]
+}
+
+@lru_cache(maxsize=None)
 def get_collection_from_filename(filename):
     """Extract collection name from filename - Optimized for your data"""
-    filename_lower = filename.lower()
-    
-    # Handle your specific folder names
-    if any(word in filename_lower for word in ['ramcharitmanas', 'ramcharit']):
-        return 'Ramcharitmanas'
-    elif any(word in filename_lower for word in ['valmiki', 'valmikiramayana']):
-        return 'Valmiki Ramayana'
-    elif any(word in filename_lower for word in ['ramayana', 'ramayan']):
-        return 'Ramayana'
-    elif any(word in filename_lower for word in ['bhagavad', 'gita']):
-        return 'Bhagavad Gita'
-    elif 'mahabharata' in filename_lower:
-        return 'Mahabharata'
-    elif any(word in filename_lower for word in ['rigveda', 'rig_veda']):
-        return 'Rigveda'
-    elif any(word in filename_lower for word in ['yajurveda', 'yajur_veda']):
-        return 'Yajurveda'
-    elif any(word in filename_lower for word in ['atharvaveda', 'atharva_veda']):
-        return 'Atharvaveda'
-    else:
-        return 'Sacred Texts'
+    match = COLLECTION_RE.match(filename)
+    return COLLECTION_BY_GROUP[match.lastgroup] if match else DEFAULT_COLLECTION
+
+# Common field names for different languages/formats
+CONTENT_FIELDS = (
+    'text', 'content', 'verse', 'shloka', 'mantra', 'doha', 'chaupai',
+    'sanskrit', 'devanagari', 'hindi', 'english', 'translation', 
+    'meaning', 'commentary', 'explanation'
+)
+CONTENT_FIELD_SET = frozenset(CONTENT_FIELDS)
+CONTENT_FIELD_RANK = {field: rank for rank, field in enumerate(CONTENT_FIELDS)}
+
+def _format_list_file(filename, file_content, collection, collection_key, extract_content):
+    """Handle list of items (verses, chapters, etc.)"""
+    # Metadata shared by every item is built once per file
+    base_metadata = {
+        "collection": collection_key,
+        "source_file": filename,
+        "total_items": len(file_content),
+        "collection_display": collection
+    }
+    return (
+        {
+            "id": f"{filename}_{idx}",
+            "content": extract_content(item),
+            "metadata": {**base_metadata, "item_index": idx}
+        }
+        for idx, item in enumerate(file_content)
+    )
+
+def _single_item(filename, content, collection, collection_key):
+    """Wrap a whole file as one RAG item"""
+    return ({
+        "id": filename,
+        "content": content,
+        "metadata": {
+            "collection": collection_key,
+            "source_file": filename,
+            "item_index": 0,
+            "total_items": 1,
+            "collection_display": collection
+        }
+    },)
+
+def _format_dict_file(filename, file_content, collection, collection_key, extract_content):
+    """Handle single dictionary"""
+    return _single_item(filename, extract_content(file_content), collection, collection_key)
+
+def _format_scalar_file(filename, file_content, collection, collection_key, extract_content):
+    """Handle other data types"""
+    return _single_item(filename, {"text": str(file_content)}, collection, collection_key)
+
+# Exact-type dispatch: one dict lookup per file instead of an isinstance chain
+FILE_FORMATTERS = {list: _format_list_file, dict: _format_dict_file}
 
 # Compatibility class for existing RAG code
 class DharmicDataLoader:
@@ -138,93 +305,63 @@ class DharmicDataLoader:
     def load_all_texts(self):
         """Load and format all texts for RAG processing"""
         if self._data is None:
-            raw_data = self.load_data()
-            self._data = self._convert_to_rag_format(raw_data)
+            # Formatted texts are cached on disk under the same signature as
+            # the raw data, so a cold start skips both parsing and formatting
+            cache_file = None
+            if os.path.isdir(DATA_DIR):
+                signature = _data_signature(list(_iter_json_files(DATA_DIR)))
+                cache_file = Path(Config.CACHE_PATH) / f"{FORMATTED_CACHE_PREFIX}v{FORMATTED_CACHE_VERSION}_{signature}.pkl"
+                if cache_file.exists():
+                    self._data = _load_cached_data(cache_file)
+            
+            if self._data is None:
+                raw_data = self.load_data()
+                self._data = list(self._iter_rag_format(raw_data))
+                if cache_file is not None and self._data:
+                    _save_cached_data(cache_file, self._data, FORMATTED_CACHE_PREFIX)
         return self._data
     
+    def iter_all_texts(self):
+        """Yield formatted texts lazily, without holding the whole list"""
+        if self._data is not None:
+            return iter(self._data)
+        return self._iter_rag_format(self.load_data())
+    
     def get_all_texts(self):
         """Get all loaded texts (alias for load_all_texts)"""
         return self.load_all_texts()
     
-    def _convert_to_rag_format(self, raw_data):
-        """Convert raw JSON data to RAG-compatible format"""
-        formatted_texts = []
+    def _iter_rag_format(self, raw_data):
+        """Convert raw JSON data to RAG-compatible format, one item at a time"""
+        extract_content = self._extract_content_fields
         
         for filename, file_content in raw_data.items():
             collection = get_collection_from_filename(filename)
+            # Built once at import, so every item shares one key string
+            collection_key = COLLECTION_KEYS[collection]
+            formatter = FILE_FORMATTERS.get(type(file_content), _format_scalar_file)
             
             try:
-                if isinstance(file_content, list):
-                    # Handle list of items (verses, chapters, etc.)
-                    for idx, item in enumerate(file_content):
-                        formatted_item = {
-                            "id": f"{filename}_{idx}",
-                            "content": self._extract_content_fields(item),
-                            "metadata": {
-                                "collection": collection.lower().replace(' ', '_'),
-                                "source_file": filename,
-                                "item_index": idx,
-                                "total_items": len(file_content),
-                                "collection_display": collection
-                            }
-                        }
-                        formatted_texts.append(formatted_item)
-                
-                elif isinstance(file_content, dict):
-                    # Handle single dictionary
-                    formatted_item = {
-                        "id": filename,
-                        "content": self._extract_content_fields(file_content),
-                        "metadata": {
-                            "collection": collection.lower().replace(' ', '_'),
-                            "source_file": filename,
-                            "item_index": 0,
-                            "total_items": 1,
-                            "collection_display": collection
-                        }
-                    }
-                    formatted_texts.append(formatted_item)
-                
-                else:
-                    # Handle other data types
-                    formatted_item = {
-                        "id": filename,
-                        "content": {"text": str(file_content)},
-                        "metadata": {
-                            "collection": collection.lower().replace(' ', '_'),
-                            "source_file": filename,
-                            "item_index": 0,
-                            "total_items": 1,
-                            "collection_display": collection
-                        }
-                    }
-                    formatted_texts.append(formatted_item)
-                    
+                yield from formatter(filename, file_content, collection, collection_key, extract_content)
             except Exception as e:
                 st.warning(f"⚠️ Error processing {filename}: {str(e)}")
                 continue
-        
-        return formatted_texts
     
     def _extract_content_fields(self, item):
         """Extract text content from various field structures"""
         content = {}
         
         if isinstance(item, dict):
-            # Common field names for different languages/formats
-            text_fields = [
-                'text', 'content', 'verse', 'shloka', 'mantra', 'doha', 'chaupai',
-                'sanskrit', 'devanagari', 'hindi', 'english', 'translation', 
-                'meaning', 'commentary', 'explanation'
-            ]
-            
-            for field in text_fields:
-                if field in item and item[field]:
-                    content[field] = str(item[field]).strip()
+            # Only visit the fields this item actually has, in priority order
+            present = CONTENT_FIELD_SET.intersection(item)
+            for field in sorted(present, key=CONTENT_FIELD_RANK.__getitem__):
+                value = item[field]
+                if value:
+                    content[field] = value.strip() if type(value) is str else str(value).strip()
             
-            # If no text fields found, convert entire dict to text
+            # If no text fields found, serialize the entire dict as JSON text
             if not content:
-                content['text'] = str(item)
+                content['text'] = dumps(item).decode('utf-8')
         else:
             content['text'] = str(item)
         
@@ -239,11 +376,16 @@ def get_all_scripture_data():
     """Alternative function name"""
     return load_all_scripture_data()
 
-def get_formatted_scripture_data():
-    """Get formatted scripture data for RAG"""
+@st.cache_resource(show_spinner=False)
+def _cached_formatted():
+    """Format scripture data for RAG once per process (read-only)"""
     loader = DharmicDataLoader()
     return loader.load_all_texts()
 
+def get_formatted_scripture_data():
+    """Get formatted scripture data for RAG"""
+    return _cached_formatted()
+
 # Test function
 def test_data_loading():
     """Test the data loading functionality"""
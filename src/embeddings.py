@@ -1,15 +1,63 @@
 
+import faiss
 import numpy as np
 import streamlit as st
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Union
 import os
+from functools import lru_cache
 from pathlib import Path
-from src.utils import setup_logging, ensure_dir
+from src.utils import setup_logging, ensure_dir, loads, dumps
 from config import Config
 
 logger = setup_logging()
 
+# torch and sentence_transformers are imported inside the methods that load or
+# run the encoder, keeping them off the import path of every Streamlit worker
+
+# Number of recent query embeddings kept in memory
+QUERY_CACHE_SIZE = 512
+
+# Batch size for corpus encoding
+EMBEDDING_BATCH_SIZE = 64
+
+# Rows converted to FP32 at a time while building the search index
+INDEX_BUILD_BLOCK_ROWS = 16_384
+
+def quantize_embeddings(embeddings: np.ndarray) -> tuple:
+    """Quantize rows to INT8 with a per-row scale, returning (codes, scales)"""
+    max_abs = np.abs(embeddings).max(axis=1, keepdims=True)
+    scales = (127.0 / np.maximum(max_abs, 1e-12)).astype(np.float32)
+    codes = np.rint(embeddings * scales).astype(np.int8)
+    return codes, scales
+
+def dequantize_embeddings(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Recover FP32 embeddings from INT8 codes and per-row scales"""
+    return codes.astype(np.float32) / scales
+
+class QuantizedEmbeddings(NamedTuple):
+    """INT8 embedding codes with per-row scales, as stored on disk"""
+    codes: np.ndarray   # (n, dim) int8, usually memory-mapped
+    scales: np.ndarray  # (n, 1) float32
+    
+    @property
+    def shape(self) -> tuple:
+        return self.codes.shape
+
+# What load_embeddings returns and the search methods accept
+EmbeddingMatrix = Union[np.ndarray, QuantizedEmbeddings]
+
+def embedding_rows(embeddings: EmbeddingMatrix, rows) -> np.ndarray:
+    """Contiguous FP32 copy of the selected rows (slice or index array)"""
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return dequantize_embeddings(embeddings.codes[rows], embeddings.scales[rows])
+    return np.array(embeddings[rows], dtype=np.float32)  # Always a copy, never a view
+
+def iter_embedding_blocks(embeddings: EmbeddingMatrix, block_rows: int = INDEX_BUILD_BLOCK_ROWS):
+    """Yield FP32 row blocks, so a memory-mapped matrix is never copied whole"""
+    num_rows = embeddings.shape[0]
+    for start in range(0, num_rows, block_rows):
+        yield embedding_rows(embeddings, slice(start, min(start + block_rows, num_rows)))
+
 class EmbeddingManager:
     """Manage text embeddings using sentence-transformers"""
     
@@ -18,12 +66,26 @@ class EmbeddingManager:
         self.embeddings_path = Config.EMBEDDINGS_PATH
         self.model_name = Config.EMBEDDING_MODEL
         ensure_dir(self.embeddings_path)
+        self._encode_query_cached = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._encode_query)
+        self._search_index = None
+        self._search_index_source = None
     
     @st.cache_resource
     def load_model(_self):
         """Load sentence transformer model with caching"""
+        import torch
+        from sentence_transformers import SentenceTransformer
+        
         try:
             logger.info(f"Loading embedding model: {_self.model_name}")
+            
+            # Prefer quantized ONNX Runtime encoder when there is no GPU
+            if Config.USE_ONNX_EMBEDDINGS and not torch.cuda.is_available():
+                model = _self._load_onnx_model()
+                if model is not None:
+                    logger.info("Embedding model loaded with ONNX Runtime backend")
+                    return model
+            
             model = SentenceTransformer(_self.model_name)
             logger.info("Embedding model loaded successfully")
             return model
@@ -34,6 +96,26 @@ class EmbeddingManager:
             logger.info(f"Trying fallback model: {fallback_model}")
             return SentenceTransformer(fallback_model)
     
+    def _load_onnx_model(self):
+        """Load INT8-quantized ONNX export of the model, exporting it on first use"""
+        onnx_dir = os.path.join(self.embeddings_path, "onnx_model")
+        quantized_file = os.path.join("onnx", "model_qint8_avx2.onnx")
+        
+        try:
+            from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+            
+            if not os.path.exists(os.path.join(onnx_dir, quantized_file)):
+                logger.info("Exporting embedding model to ONNX with dynamic INT8 quantization")
+                onnx_model = SentenceTransformer(self.model_name, backend="onnx")
+                onnx_model.save(onnx_dir)
+                export_dynamic_quantized_onnx_model(onnx_model, "avx2", onnx_dir)
+            
+            return SentenceTransformer(onnx_dir, backend="onnx", model_kwargs={"file_name": quantized_file})
+            
+        except Exception as e:
+            logger.warning(f"ONNX embedding backend unavailable, using PyTorch: {e}")
+            return None
+    
     def create_embeddings(self, texts: List[Dict[str, Any]]) -> np.ndarray:
         """Create embeddings for all texts"""
         if not self.model:
@@ -44,23 +126,21 @@ class EmbeddingManager:
         
         logger.info(f"Creating embeddings for {len(text_list)} texts")
         
+        import torch
+        
         try:
             with st.spinner("Creating embeddings..."):
-                # Create embeddings in batches to manage memory
-                batch_size = 32
-                embeddings = []
-                
-                for i in range(0, len(text_list), batch_size):
-                    batch = text_list[i:i + batch_size]
-                    batch_embeddings = self.model.encode(
-                        batch,
-                        show_progress_bar=True,
-                        convert_to_numpy=True,
-                        normalize_embeddings=True
-                    )
-                    embeddings.extend(batch_embeddings)
-            
-            embeddings_array = np.array(embeddings)
+                # SentenceTransformers batches internally and returns one
+                # contiguous array, so no Python-level batch loop is needed
+                embeddings_array = self.model.encode(
+                    text_list,
+                    batch_size=EMBEDDING_BATCH_SIZE,
+                    show_progress_bar=True,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    device="cuda" if torch.cuda.is_available() else "cpu"
+                )
+            
             logger.info(f"Created embeddings shape: {embeddings_array.shape}")
             
             return embeddings_array
@@ -72,9 +152,12 @@ class EmbeddingManager:
     def save_embeddings(self, embeddings: np.ndarray, texts: List[Dict[str, Any]]):
         """Save embeddings and metadata to disk"""
         try:
-            # Save embeddings
-            embeddings_file = os.path.join(self.embeddings_path, "text_embeddings.npy")
-            np.save(embeddings_file, embeddings)
+            # Save embeddings as INT8 with one scale per row (4x smaller than FP32)
+            embeddings_file = os.path.join(self.embeddings_path, "text_embeddings_i8.npy")
+            scales_file = os.path.join(self.embeddings_path, "embedding_scales.npy")
+            quantized, scales = quantize_embeddings(embeddings)
+            np.save(embeddings_file, quantized)
+            np.save(scales_file, scales)
             
             # Save metadata
             metadata_file = os.path.join(self.embeddings_path, "embedding_metadata.json")
@@ -85,9 +168,8 @@ class EmbeddingManager:
                 "num_texts": len(texts)
             }
             
-            import json
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            # Compact, not indented: the file is machine-read and can hold the whole corpus
+            Path(metadata_file).write_bytes(dumps(metadata))
             
             logger.info(f"Saved embeddings to {embeddings_file}")
             
@@ -95,19 +177,35 @@ class EmbeddingManager:
             logger.error(f"Error saving embeddings: {e}")
     
     def load_embeddings(self) -> tuple:
-        """Load embeddings and metadata from disk"""
+        """Load embeddings and metadata from disk
+        
+        Embeddings come back memory-mapped, as QuantizedEmbeddings for INT8
+        files or the raw FP16/FP32 array for legacy files; they are never
+        expanded to a dense FP32 matrix. Pass them to search_similar as is.
+        """
         try:
-            embeddings_file = os.path.join(self.embeddings_path, "text_embeddings.npy")
+            embeddings_file = os.path.join(self.embeddings_path, "text_embeddings_i8.npy")
+            scales_file = os.path.join(self.embeddings_path, "embedding_scales.npy")
+            legacy_file = os.path.join(self.embeddings_path, "text_embeddings.npy")
             metadata_file = os.path.join(self.embeddings_path, "embedding_metadata.json")
             
-            if not (os.path.exists(embeddings_file) and os.path.exists(metadata_file)):
+            if not os.path.exists(metadata_file):
                 return None, None
             
-            embeddings = np.load(embeddings_file)
+            # Memory-map so pages are only read when touched; the search index
+            # dequantizes block by block
+            if os.path.exists(embeddings_file) and os.path.exists(scales_file):
+                embeddings = QuantizedEmbeddings(
+                    np.load(embeddings_file, mmap_mode='r'), np.load(scales_file, mmap_mode='r')
+                )
+            elif os.path.exists(legacy_file):
+                # FP16/FP32 files written before INT8 storage stay mapped; the
+                # search index upcasts them block by block
+                embeddings = np.load(legacy_file, mmap_mode='r')
+            else:
+                return None, None
             
-            import json
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = loads(Path(metadata_file).read_bytes())
             
             logger.info(f"Loaded embeddings shape: {embeddings.shape}")
             return embeddings, metadata["texts"]
@@ -116,27 +214,60 @@ class EmbeddingManager:
             logger.error(f"Error loading embeddings: {e}")
             return None, None
     
-    def search_similar(self, query: str, embeddings: np.ndarray, 
-                      texts: List[Dict[str, Any]], k: int = 5) -> List[Dict[str, Any]]:
-        """Find similar texts using cosine similarity"""
+    def encode_query(self, query: str) -> np.ndarray:
+        """Return normalized query embedding of shape (1, dim), reusing cached results"""
+        return self._encode_query_cached(query)
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Encode a single query (uncached)"""
         if not self.model:
             self.model = self.load_model()
         
-        # Create query embedding
-        query_embedding = self.model.encode([query], normalize_embeddings=True)
-        
-        # Calculate similarities
-        similarities = np.dot(embeddings, query_embedding.T).flatten()
-        
-        # Get top k indices
-        top_indices = np.argsort(similarities)[::-1][:k]
+        query_embedding = self.model.encode([query], normalize_embeddings=True).astype(np.float32)
+        query_embedding.flags.writeable = False  # Shared between callers via the cache
+        return query_embedding
+    
+    def _get_search_index(self, embeddings: EmbeddingMatrix) -> faiss.Index:
+        """Inner-product FAISS index over embeddings, loaded or built once
         
-        # Return results with similarity scores
+        Uses the index saved by generate_embeddings when it covers the same
+        vectors; otherwise VectorStore builds one in memory with the same
+        settings, so build-time and query-time search always agree.
+        """
+        if self._search_index is None or self._search_index_source is not embeddings:
+            # Imported here: vector_store builds on this module's row helpers
+            from src.vector_store import VectorStore
+            
+            vector_store = VectorStore()
+            if not (vector_store.load_index()
+                    and (vector_store.index.ntotal, vector_store.index.d) == tuple(embeddings.shape)):
+                logger.info("No matching saved FAISS index, building one in memory")
+                vector_store.create_index(embeddings)
+            
+            self._search_index = vector_store.index
+            self._search_index_source = embeddings
+        return self._search_index
+    
+    def _collect_results(self, scores: np.ndarray, indices: np.ndarray,
+                         texts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Turn one row of FAISS scores/ids into result dicts above the threshold"""
         results = []
-        for idx in top_indices:
-            if similarities[idx] >= Config.SIMILARITY_THRESHOLD:
+        for score, idx in zip(scores, indices):
+            if idx >= 0 and score >= Config.SIMILARITY_THRESHOLD:
                 result = texts[idx].copy()
-                result["similarity_score"] = float(similarities[idx])
+                result["similarity_score"] = float(score)
                 results.append(result)
-        
         return results
+    
+    def search_similar(self, query: str, embeddings: EmbeddingMatrix, 
+                      texts: List[Dict[str, Any]], k: int = 5) -> List[Dict[str, Any]]:
+        """Find similar texts using cosine similarity"""
+        # Create query embedding (cached for repeated queries)
+        query_embedding = self.encode_query(query)
+        
+        # Top-k inner products (cosine, as vectors are normalized)
+        index = self._get_search_index(embeddings)
+        scores, indices = index.search(query_embedding, k)
+        
+        # Return results with similarity scores
+        return self._collect_results(scores[0], indices[0], texts)
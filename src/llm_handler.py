@@ -1,26 +1,53 @@
 
+import copy
+import importlib.util
 import streamlit as st
-from transformers import pipeline, AutoTokenizer
-from typing import Dict, List, Any
-import torch
+from functools import lru_cache
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Dict, List, Any, Iterator, Tuple
 from src.utils import setup_logging
 from config import Config
 
+# torch, transformers and vllm are imported on first use: they take seconds
+# to import and sessions that never generate should not pay for them
+if TYPE_CHECKING:
+    import torch
+
+VLLM_AVAILABLE = importlib.util.find_spec("vllm") is not None
+# Optional GPU extra (pip install bitsandbytes) for nf4/int8 weight quantization
+BITSANDBYTES_AVAILABLE = importlib.util.find_spec("bitsandbytes") is not None
+
 logger = setup_logging()
 
+# Separator between retrieved passages in the prompt context
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+
+# Number of tokenized context passages kept in memory
+TOKEN_CACHE_SIZE = 1024
+
+# Seconds to wait for the next streamed token before giving up on generation
+STREAM_TOKEN_TIMEOUT = 60
+
 class LLMHandler:
     """Handle Language Model operations for response generation"""
     
     def __init__(self):
         self.model = None
         self.tokenizer = None
+        self.engine = None
         self.model_name = Config.LLM_MODEL
         self.max_length = Config.MAX_LENGTH
         self.temperature = Config.TEMPERATURE
+        # Prefilled KV cache per static prompt header (one per language)
+        self._prefix_cache: Dict[str, Tuple["torch.Tensor", Any]] = {}
+        # Passages recur across queries, so their token ids are reused
+        self._encode_segment_cached = lru_cache(maxsize=TOKEN_CACHE_SIZE)(self._encode_segment)
     
     @st.cache_resource
     def load_model(_self):
         """Load LLM model with caching"""
+        from transformers import pipeline, AutoModelForCausalLM, AutoTokenizer
+        
         try:
             logger.info(f"Loading LLM model: {_self.model_name}")
             
@@ -29,14 +56,12 @@ class LLMHandler:
             if tokenizer.pad_token is None:
                 tokenizer.pad_token = tokenizer.eos_token
             
-            # Load model pipeline
-            model = pipeline(
-                "text-generation",
-                model=_self.model_name,
-                tokenizer=tokenizer,
-                torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-                device_map="auto" if torch.cuda.is_available() else None
+            # Load the causal LM directly (not a pipeline) so generate() can
+            # reuse the prefilled past_key_values of the prompt header
+            model = AutoModelForCausalLM.from_pretrained(
+                _self.model_name, **_self._model_load_kwargs()
             )
+            model.eval()
             
             logger.info("LLM model loaded successfully")
             return model, tokenizer
@@ -51,11 +76,74 @@ class LLMHandler:
             except:
                 raise Exception("Failed to load any suitable LLM model")
     
+    @st.cache_resource
+    def load_engine(_self):
+        """Load the vLLM engine with caching, shared by all sessions"""
+        from vllm import LLM
+        
+        logger.info(f"Loading vLLM engine: {_self.model_name}")
+        engine = LLM(
+            model=_self.model_name,
+            dtype="float16",
+            gpu_memory_utilization=0.85,
+            enable_prefix_caching=True
+        )
+        logger.info("vLLM engine loaded successfully")
+        return engine, Lock()
+    
+    def _use_vllm(self) -> bool:
+        """Whether generation goes through vLLM instead of transformers"""
+        if not (Config.USE_VLLM and VLLM_AVAILABLE):
+            return False
+        import torch
+        return torch.cuda.is_available()
+    
+    def _generate_vllm(self, prompt: str) -> str:
+        """Generate a completion for prompt with the vLLM engine"""
+        from vllm import SamplingParams
+        
+        engine, lock = self.engine
+        params = SamplingParams(
+            temperature=self.temperature,
+            top_p=Config.TOP_P,
+            max_tokens=self.max_length
+        )
+        # The offline engine is not re-entrant; concurrent sessions queue here
+        with lock:
+            outputs = engine.generate([prompt], params, use_tqdm=False)
+        return outputs[0].outputs[0].text
+    
+    def _model_load_kwargs(self) -> Dict[str, Any]:
+        """from_pretrained kwargs for the configured weight quantization"""
+        import torch
+        from transformers import BitsAndBytesConfig
+        
+        if not torch.cuda.is_available():
+            # bitsandbytes kernels are CUDA-only; load full precision on CPU
+            return {"torch_dtype": torch.float32}
+        
+        kwargs = {"torch_dtype": torch.float16, "device_map": "auto"}
+        if Config.QUANTIZATION in ("nf4", "int8") and not BITSANDBYTES_AVAILABLE:
+            logger.warning(f"bitsandbytes not installed, loading {Config.QUANTIZATION} model in fp16")
+        elif Config.QUANTIZATION == "nf4":
+            kwargs["quantization_config"] = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_compute_dtype=torch.float16,
+                bnb_4bit_quant_type="nf4"
+            )
+        elif Config.QUANTIZATION == "int8":
+            kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+        return kwargs
+    
     def generate_response(self, query: str, context_docs: List[Dict[str, Any]], 
                          language_preference: str = "all") -> Dict[str, Any]:
         """Generate response using LLM with context"""
         
-        if not self.model:
+        use_vllm = self._use_vllm()
+        if use_vllm:
+            if self.engine is None:
+                self.engine = self.load_engine()
+        elif not self.model:
             self.model, self.tokenizer = self.load_model()
         
         # Create context from retrieved documents
@@ -67,20 +155,30 @@ class LLMHandler:
         try:
             # Generate response
             with st.spinner("Generating response..."):
-                response = self.model(
-                    prompt,
-                    max_length=self.max_length,
-                    temperature=self.temperature,
-                    num_return_sequences=1,
-                    do_sample=True,
-                    top_p=Config.TOP_P,
-                    pad_token_id=self.tokenizer.pad_token_id if self.tokenizer else None,
-                    eos_token_id=self.tokenizer.eos_token_id if self.tokenizer else None,
-                    truncation=True
-                )
-            
-            # Extract generated text
-            generated_text = response[0]['generated_text']
+                if use_vllm:
+                    generated_text = self._generate_vllm(prompt)
+                elif self.tokenizer is None:
+                    # Fallback pipeline: no tokenizer, so no prefix cache either
+                    response = self.model(
+                        prompt,
+                        max_length=self.max_length,
+                        temperature=self.temperature,
+                        num_return_sequences=1,
+                        do_sample=True,
+                        top_p=Config.TOP_P,
+                        truncation=True
+                    )
+                    generated_text = response[0]['generated_text']
+                else:
+                    import torch
+                    
+                    inputs = self._generation_inputs(prompt, context)
+                    with torch.no_grad():
+                        output_ids = self.model.generate(**inputs)
+                    prompt_length = inputs["input_ids"].shape[-1]
+                    generated_text = self.tokenizer.decode(
+                        output_ids[0][prompt_length:], skip_special_tokens=True
+                    )
             
             # Clean and format response
             clean_response = self._clean_response(generated_text, prompt)
@@ -96,6 +194,119 @@ class LLMHandler:
             logger.error(f"Error generating response: {e}")
             return self._fallback_response(query, context_docs)
     
+    def stream_response(self, query: str, context_docs: List[Dict[str, Any]],
+                        language_preference: str = "all") -> Iterator[str]:
+        """Generate response with LLM, yielding text as tokens are decoded"""
+        
+        if not self._use_vllm() and not self.model:
+            self.model, self.tokenizer = self.load_model()
+        
+        if self._use_vllm() or self.tokenizer is None:
+            # vLLM offline engine and fallback pipeline return whole completions
+            yield self.generate_response(query, context_docs, language_preference)["response"]
+            return
+        
+        context = self._format_context(context_docs)
+        prompt = self._create_prompt(query, context, language_preference)
+        
+        from transformers import TextIteratorStreamer
+        
+        streamer = TextIteratorStreamer(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=STREAM_TOKEN_TIMEOUT
+        )
+        inputs = {**self._generation_inputs(prompt, context), "streamer": streamer}
+        errors = []
+        
+        def generate():
+            # Record failures and close the stream so the consumer never waits on a dead thread
+            try:
+                self.model.generate(**inputs)
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+        
+        # Run generation in background; the streamer yields decoded text as it arrives
+        generation = Thread(target=generate, daemon=True)
+        generation.start()
+        
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        except Exception as e:
+            # queue.Empty when no token arrived within STREAM_TOKEN_TIMEOUT
+            logger.error(f"Error streaming response: {e!r}")
+            yield self._fallback_response(query, context_docs)["response"]
+            return
+        
+        generation.join()
+        if errors:
+            logger.error(f"Error generating streamed response: {errors[0]}")
+            yield self._fallback_response(query, context_docs)["response"]
+    
+    def _prefix_state(self, prefix: str) -> Tuple["torch.Tensor", Any]:
+        """Token ids and prefilled KV cache for a static prompt header"""
+        import torch
+        
+        cached = self._prefix_cache.get(prefix)
+        if cached is None:
+            prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids.to(self.model.device)
+            with torch.no_grad():
+                outputs = self.model(input_ids=prefix_ids, use_cache=True)
+            cached = (prefix_ids, outputs.past_key_values)
+            self._prefix_cache[prefix] = cached
+        return cached
+    
+    def _encode_segment(self, text: str) -> "torch.Tensor":
+        """Token ids of shape (1, n) for a piece of the prompt, no special tokens"""
+        return self.tokenizer(
+            text, return_tensors="pt", add_special_tokens=False
+        ).input_ids.to(self.model.device)
+    
+    def _generation_inputs(self, prompt: str, context: str) -> Dict[str, Any]:
+        """Build generate() kwargs, reusing the prefilled header of the prompt.
+        
+        Every prompt template is a fixed instruction header followed by the
+        retrieved context, so the text before the context is prefilled once
+        per language. Context passages are tokenized once and cached; only the
+        question and the closing instructions are encoded per call.
+        """
+        import torch
+        
+        split = prompt.find(context) if context else -1
+        prefix = prompt[:split] if split > 0 else ""
+        
+        kwargs = {
+            "max_length": self.max_length,
+            "temperature": self.temperature,
+            "num_return_sequences": 1,
+            "do_sample": True,
+            "top_p": Config.TOP_P,
+            "pad_token_id": self.tokenizer.pad_token_id,
+            "eos_token_id": self.tokenizer.eos_token_id
+        }
+        
+        if prefix:
+            prefix_ids, prefix_kv = self._prefix_state(prefix)
+            separator_ids = self._encode_segment_cached(CONTEXT_SEPARATOR)
+            
+            pieces = [prefix_ids]
+            for i, passage in enumerate(context.split(CONTEXT_SEPARATOR)):
+                if i:
+                    pieces.append(separator_ids)
+                pieces.append(self._encode_segment_cached(passage))
+            pieces.append(self._encode_segment(prompt[split + len(context):]))
+            
+            input_ids = torch.cat(pieces, dim=-1)
+            # generate() extends the cache in place, so hand it a copy
+            kwargs["past_key_values"] = copy.deepcopy(prefix_kv)
+        else:
+            input_ids = self.tokenizer(prompt, return_tensors="pt").input_ids.to(self.model.device)
+        
+        kwargs["input_ids"] = input_ids
+        kwargs["attention_mask"] = torch.ones_like(input_ids)
+        return kwargs
+    
     def _format_context(self, context_docs: List[Dict[str, Any]]) -> str:
         """Format retrieved documents as context"""
         context_parts = []
@@ -115,7 +326,7 @@ English: {content.get('english', 'N/A')}
 """
             context_parts.append(doc_text.strip())
         
-        return "\n\n---\n\n".join(context_parts)
+        return CONTEXT_SEPARATOR.join(context_parts)
     
     def _create_prompt(self, query: str, context: str, language_preference: str) -> str:
         """Create appropriate prompt based on language preference"""
@@ -6,16 +6,44 @@ from src.utils import setup_logging
 
 logger = setup_logging()
 
+# Patterns are compiled once at import and shared by every processor
+DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+DEVANAGARI_RUN_RE = re.compile(r'[\u0900-\u097F]+')
+WORD_RE = re.compile(r'\b\w+\b')
+# Markers that distinguish Sanskrit from Hindi, found in a single scan
+SANSKRIT_INDICATOR_RE = re.compile('|'.join(map(re.escape, ['श्लोक', 'मन्त्र', 'ॐ', '॥'])))
+
+# Simple character mapping for basic transliteration; str.translate handles
+# multi-character outputs, so the whole conversion runs in one C-level pass
+TRANSLITERATION_TABLE = str.maketrans({
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
+    'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
+    'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nja',
+    'ट': 'ta', 'ठ': 'tha', 'ड': 'da', 'ढ': 'dha', 'ण': 'na',
+    'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
+    'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
+    'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va',
+    'श': 'sha', 'ष': 'sha', 'स': 'sa', 'ह': 'ha',
+    'ं': 'm', 'ः': 'h', '्': '', '।': '.', '॥': '||'
+})
+
+# Output key -> content key for each language preference, in display order
+_ALL_LANGUAGE_FIELDS = (
+    ("sanskrit", "sanskrit"), ("hindi", "hindi"), ("english", "english"), ("combined", "text")
+)
+LANGUAGE_PREFERENCE_FIELDS = {
+    "all": _ALL_LANGUAGE_FIELDS,
+    "🌍 All Languages": _ALL_LANGUAGE_FIELDS,
+    "🇮🇳 Hindi": (("primary", "hindi"), ("secondary", "english"), ("original", "sanskrit")),
+    "🇬🇧 English": (("primary", "english"), ("secondary", "hindi"), ("original", "sanskrit")),
+    "🕉️ Sanskrit": (("primary", "sanskrit"), ("secondary", "hindi"), ("translation", "english")),
+}
+
 class MultilingualProcessor:
     """Handle multilingual text processing and language detection"""
     
     def __init__(self):
-        self.language_patterns = {
-            'sanskrit': r'[\u0900-\u097F]',  # Devanagari
-            'hindi': r'[\u0900-\u097F]',     # Also Devanagari
-            'english': r'[a-zA-Z]'
-        }
-        
         self.concept_translations = {
             'dharma': {'hindi': 'धर्म', 'sanskrit': 'धर्म', 'english': 'righteousness'},
             'karma': {'hindi': 'कर्म', 'sanskrit': 'कर्म', 'english': 'action'},
@@ -24,21 +52,30 @@ class MultilingualProcessor:
             'yoga': {'hindi': 'योग', 'sanskrit': 'योग', 'english': 'union'},
             'gyana': {'hindi': 'ज्ञान', 'sanskrit': 'ज्ञान', 'english': 'knowledge'}
         }
+        # One compiled alternation finds every concept in a single scan of the
+        # query; the text appended per concept is built here once
+        self._concept_re = re.compile(
+            '|'.join(map(re.escape, (concept.lower() for concept in self.concept_translations)))
+        )
+        self._concept_expansions = {
+            concept.lower(): " " + " ".join(
+                [translations['hindi'], translations['sanskrit'], translations['english']]
+            )
+            for concept, translations in self.concept_translations.items()
+        }
     
     def detect_language(self, text: str) -> str:
         """Detect primary language of text"""
         try:
-            # Use langdetect for basic detection
-            detected = detect(text)
-            
-            # Check for Devanagari script
-            if re.search(self.language_patterns['sanskrit'], text):
+            # Check for Devanagari script first; langdetect is only needed without it
+            if DEVANAGARI_RE.search(text):
                 # Distinguish between Sanskrit and Hindi
-                sanskrit_indicators = ['श्लोक', 'मन्त्र', 'ॐ', '॥']
-                if any(indicator in text for indicator in sanskrit_indicators):
+                if SANSKRIT_INDICATOR_RE.search(text):
                     return 'sanskrit'
                 return 'hindi'
             
+            # Use langdetect for basic detection
+            detected = detect(text)
             return 'english' if detected == 'en' else detected
             
         except Exception as e:
@@ -47,66 +84,21 @@ class MultilingualProcessor:
     
     def expand_query(self, query: str) -> str:
         """Expand query with multilingual concepts"""
-        expanded_query = query
+        found = set(self._concept_re.findall(query.lower()))
+        if not found:
+            return query
         
-        for concept, translations in self.concept_translations.items():
-            if concept.lower() in query.lower():
-                # Add all translations
-                all_forms = [translations['hindi'], translations['sanskrit'], translations['english']]
-                expanded_query += " " + " ".join(all_forms)
-        
-        return expanded_query
+        # Add all translations, in concept order and once per concept
+        return query + "".join(
+            expansion for concept, expansion in self._concept_expansions.items()
+            if concept in found
+        )
     
     def format_multilingual_text(self, content: Dict[str, str], language_preference: str = "all") -> Dict[str, str]:
         """Format text according to language preference"""
-        formatted = {}
-        
-        if language_preference == "all" or language_preference == "🌍 All Languages":
-            formatted = {
-                "sanskrit": content.get("sanskrit", ""),
-                "hindi": content.get("hindi", ""),
-                "english": content.get("english", ""),
-                "combined": content.get("text", "")
-            }
-        elif language_preference == "🇮🇳 Hindi":
-            formatted = {
-                "primary": content.get("hindi", ""),
-                "secondary": content.get("english", ""),
-                "original": content.get("sanskrit", "")
-            }
-        elif language_preference == "🇬🇧 English":
-            formatted = {
-                "primary": content.get("english", ""),
-                "secondary": content.get("hindi", ""),
-                "original": content.get("sanskrit", "")
-            }
-        elif language_preference == "🕉️ Sanskrit":
-            formatted = {
-                "primary": content.get("sanskrit", ""),
-                "secondary": content.get("hindi", ""),
-                "translation": content.get("english", "")
-            }
-        
-        return formatted
+        fields = LANGUAGE_PREFERENCE_FIELDS.get(language_preference, ())
+        return {output_key: content.get(content_key, "") for output_key, content_key in fields}
     
     def transliterate_devanagari(self, text: str) -> str:
         """Basic transliteration from Devanagari to Roman"""
-        # Simple character mapping for basic transliteration
-        transliteration_map = {
-            'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu',
-            'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
-            'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
-            'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nja',
-            'ट': 'ta', 'ठ': 'tha', 'ड': 'da', 'ढ': 'dha', 'ण': 'na',
-            'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
-            'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
-            'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va',
-            'श': 'sha', 'ष': 'sha', 'स': 'sa', 'ह': 'ha',
-            'ं': 'm', 'ः': 'h', '्': '', '।': '.', '॥': '||'
-        }
-        
-        transliterated = ""
-        for char in text:
-            transliterated += transliteration_map.get(char, char)
-        
-        return transliterated
+        return text.translate(TRANSLITERATION_TABLE)
@@ -1,16 +1,74 @@
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Any
-from src.multilingual import MultilingualProcessor
+from src.multilingual import DEVANAGARI_RUN_RE, WORD_RE, MultilingualProcessor
 from src.utils import setup_logging
 
 logger = setup_logging()
 
+# Number of recent processed queries kept in memory
+PROCESSED_QUERY_CACHE_SIZE = 1024
+
+# Common stop words dropped from query keywords
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'between', 'among', 'within',
+    'what', 'which', 'who', 'when', 'where', 'why', 'how', 'that', 'this',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
+    'can', 'must', 'shall', 'say', 'says', 'said', 'tell', 'tells', 'told'
+})
+# Whole-word alternation of the stop words, so one C-level sub drops them all
+STOP_WORDS_RE = re.compile(
+    r'\b(?:' + '|'.join(sorted(STOP_WORDS, key=len, reverse=True)) + r')\b'
+)
+
+def _keyword_pattern(keywords) -> re.Pattern:
+    """Compile keywords into one pattern whose findall returns every keyword
+    occurring in the text, overlapping ones included, in a single scan"""
+    return re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+
+# (trigger words, suggestions) in display order: thematic, then character-based
+RELATED_QUERY_SUGGESTIONS = (
+    (('dharma', 'duty', 'righteousness'), (
+        "What is dharma according to Krishna?",
+        "How is dharma described in Ramayana?",
+        "Difference between svadharma and dharma"
+    )),
+    (('karma', 'action', 'deed'), (
+        "What is karma yoga in Bhagavad Gita?",
+        "How does karma work according to Hindu scriptures?",
+        "Types of karma mentioned in texts"
+    )),
+    (('meditation', 'dhyana', 'yoga'), (
+        "Meditation techniques in Hindu scriptures",
+        "What is dhyana yoga?",
+        "How to practice yoga according to Gita?"
+    )),
+    (('krishna', 'kṛṣṇa'), (
+        "Krishna's teachings on devotion",
+        "Krishna's advice to Arjuna",
+        "Stories of Krishna from Mahabharata"
+    )),
+    (('rama', 'rāma'), (
+        "Rama's qualities as ideal king",
+        "Rama's devotion to dharma",
+        "Difference between Valmiki and Tulsidas Ramayana"
+    )),
+)
+SUGGESTION_TRIGGER_RE = _keyword_pattern(
+    {word for triggers, _ in RELATED_QUERY_SUGGESTIONS for word in triggers}
+)
+
 class QueryProcessor:
     """Process and expand user queries for better search results"""
     
     def __init__(self):
         self.multilingual = MultilingualProcessor()
+        # Processing is deterministic in (query, filter); repeats skip langdetect and regex passes
+        self._process_query_cached = lru_cache(maxsize=PROCESSED_QUERY_CACHE_SIZE)(self._process_query)
         
         # Scripture-specific terms
         self.scripture_keywords = {
@@ -22,6 +80,21 @@ class QueryProcessor:
             'vedas': ['mantra', 'sukta', 'rishi', 'yajna', 'sacrifice']
         }
         
+        # Map UI names to internal keys
+        self.scripture_aliases = {
+            "bhagavad_gita": ["bhagavad gita", "gita"],
+            "ramayana": ["ramayana", "valmiki ramayana"],
+            "mahabharata": ["mahabharata"],
+            "rigveda": ["rigveda", "rig veda"],
+            "ramcharitmanas": ["ramcharitmanas", "tulsidas"]
+        }
+        # Every alias mapped to the context it adds, in priority order
+        self._alias_contexts = {
+            alias: f" {' '.join(self.scripture_keywords[key][:3])}"
+            for key, aliases in self.scripture_aliases.items()
+            for alias in aliases
+        }
+        
         # Thematic keywords
         self.themes = {
             'devotion': ['bhakti', 'love', 'surrender', 'worship', 'prayer'],
@@ -31,9 +104,40 @@ class QueryProcessor:
             'meditation': ['dhyana', 'yoga', 'concentration', 'mindfulness'],
             'knowledge': ['gyana', 'wisdom', 'understanding', 'learning']
         }
+        
+        # Common variations appended to the query when the term is present
+        self.term_variants = {
+            'krishna': 'krishna kṛṣṇa कृष्ण',
+            'rama': 'rama rāma राम',
+            'shiva': 'shiva śiva शिव',
+            'vishnu': 'vishnu viṣṇu विष्णु',
+            'hanuman': 'hanuman हनुमान',
+            'gita': 'gita gītā गीता',
+            'veda': 'veda वेद',
+            'yoga': 'yoga योग',
+            'dharma': 'dharma धर्म',
+            'karma': 'karma कर्म'
+        }
+        
+        # Keyword scans are one compiled regex pass each; the text appended
+        # for a theme keyword is built here once
+        self._variant_re = _keyword_pattern(self.term_variants)
+        self._theme_re = _keyword_pattern(
+            {keyword for keywords in self.themes.values() for keyword in keywords}
+        )
+        self._theme_additions = [
+            [(keyword, f" {' '.join([k for k in keywords if k != keyword][:3])}") for keyword in keywords]
+            for keywords in self.themes.values()
+        ]
     
     def process_query(self, query: str, scripture_filter: str = "All Texts") -> Dict[str, Any]:
-        """Process user query with context and expansion"""
+        """Process user query with context and expansion, reusing cached results"""
+        result = self._process_query_cached(query, scripture_filter)
+        # Callers get their own dict and keyword list; the cached one stays intact
+        return {**result, "keywords": list(result["keywords"])}
+    
+    def _process_query(self, query: str, scripture_filter: str) -> Dict[str, Any]:
+        """Process user query (uncached)"""
         
         # Basic cleaning
         processed_query = self._clean_query(query)
@@ -67,131 +171,62 @@ class QueryProcessor:
         # Remove extra whitespace
         query = " ".join(query.split())
         
-        # Convert to lowercase for processing (but preserve original for display)
-        query_lower = query.lower()
+        # Match on lowercase (but preserve original for display)
+        found = set(self._variant_re.findall(query.lower()))
         
         # Handle common variations
-        replacements = {
-            'krishna': 'krishna kṛṣṇa कृष्ण',
-            'rama': 'rama rāma राम',
-            'shiva': 'shiva śiva शिव',
-            'vishnu': 'vishnu viṣṇu विष्णु',
-            'hanuman': 'hanuman हनुमान',
-            'gita': 'gita gītā गीता',
-            'veda': 'veda वेद',
-            'yoga': 'yoga योग',
-            'dharma': 'dharma धर्म',
-            'karma': 'karma कर्म'
-        }
-        
-        for key, value in replacements.items():
-            if key in query_lower:
+        for key, value in self.term_variants.items():
+            if key in found:
                 query += f" {value}"
         
         return query
     
     def _add_thematic_context(self, query: str) -> str:
         """Add thematic context to query"""
-        query_lower = query.lower()
+        found = set(self._theme_re.findall(query.lower()))
+        if not found:
+            return query
         
-        for theme, keywords in self.themes.items():
-            for keyword in keywords:
-                if keyword in query_lower:
+        for additions in self._theme_additions:
+            for keyword, related_terms in additions:
+                if keyword in found:
                     # Add related terms
-                    related_terms = [k for k in keywords if k != keyword][:3]
-                    query += f" {' '.join(related_terms)}"
+                    query += related_terms
                     break
         
         return query
     
     def _add_scripture_context(self, query: str, scripture: str) -> str:
         """Add scripture-specific context"""
-        scripture_key = scripture.lower().replace(" ", "_")
+        scripture_lower = scripture.lower()
         
-        # Map UI names to internal keys
-        scripture_mapping = {
-            "bhagavad_gita": ["bhagavad gita", "gita"],
-            "ramayana": ["ramayana", "valmiki ramayana"],
-            "mahabharata": ["mahabharata"],
-            "rigveda": ["rigveda", "rig veda"],
-            "ramcharitmanas": ["ramcharitmanas", "tulsidas"]
-        }
-        
-        for key, names in scripture_mapping.items():
-            if any(name in scripture.lower() for name in names):
-                if key in self.scripture_keywords:
-                    context_terms = self.scripture_keywords[key][:3]
-                    query += f" {' '.join(context_terms)}"
-                break
+        # First alias found decides the scripture
+        for alias, context_terms in self._alias_contexts.items():
+            if alias in scripture_lower:
+                return query + context_terms
         
         return query
     
     def _extract_keywords(self, query: str) -> List[str]:
         """Extract key terms from query"""
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'between', 'among', 'within',
-            'what', 'which', 'who', 'when', 'where', 'why', 'how', 'that', 'this',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might',
-            'can', 'must', 'shall', 'say', 'says', 'said', 'tell', 'tells', 'told'
+        # Remove stop words, then extract the remaining words over two letters
+        keywords = {
+            word for word in WORD_RE.findall(STOP_WORDS_RE.sub(' ', query.lower()))
+            if len(word) > 2
         }
         
-        # Extract words
-        words = re.findall(r'\b\w+\b', query.lower())
-        
-        # Filter stop words and short words
-        keywords = [word for word in words if word not in stop_words and len(word) > 2]
-        
         # Add Devanagari terms
-        devanagari_terms = re.findall(r'[\u0900-\u097F]+', query)
-        keywords.extend(devanagari_terms)
+        keywords.update(DEVANAGARI_RUN_RE.findall(query))
         
-        return list(set(keywords))
+        return list(keywords)
     
     def suggest_related_queries(self, original_query: str) -> List[str]:
         """Suggest related queries based on the original"""
-        suggestions = []
+        found = set(SUGGESTION_TRIGGER_RE.findall(original_query.lower()))
         
-        query_lower = original_query.lower()
-        
-        # Thematic suggestions
-        if any(word in query_lower for word in ['dharma', 'duty', 'righteousness']):
-            suggestions.extend([
-                "What is dharma according to Krishna?",
-                "How is dharma described in Ramayana?",
-                "Difference between svadharma and dharma"
-            ])
-        
-        if any(word in query_lower for word in ['karma', 'action', 'deed']):
-            suggestions.extend([
-                "What is karma yoga in Bhagavad Gita?",
-                "How does karma work according to Hindu scriptures?",
-                "Types of karma mentioned in texts"
-            ])
-        
-        if any(word in query_lower for word in ['meditation', 'dhyana', 'yoga']):
-            suggestions.extend([
-                "Meditation techniques in Hindu scriptures",
-                "What is dhyana yoga?",
-                "How to practice yoga according to Gita?"
-            ])
-        
-        # Character-based suggestions
-        if any(word in query_lower for word in ['krishna', 'kṛṣṇa']):
-            suggestions.extend([
-                "Krishna's teachings on devotion",
-                "Krishna's advice to Arjuna",
-                "Stories of Krishna from Mahabharata"
-            ])
-        
-        if any(word in query_lower for word in ['rama', 'rāma']):
-            suggestions.extend([
-                "Rama's qualities as ideal king",
-                "Rama's devotion to dharma",
-                "Difference between Valmiki and Tulsidas Ramayana"
-            ])
+        suggestions = []
+        for triggers, related_queries in RELATED_QUERY_SUGGESTIONS:
+            if not found.isdisjoint(triggers):
+                suggestions.extend(related_queries)
         
         return suggestions[:5]  # Return top 5 suggestions
@@ -1,14 +1,25 @@
 
 # src/rag_chain.py - ULTRA SIMPLE TEST VERSION
 
+import asyncio
+import re
 import streamlit as st
-from typing import Dict, List, Any
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Any, Iterator, Union
+from src.query_processor import QueryProcessor
+from src.response_formatter import ResponseFormatter
+
+# Maximum number of answers kept in the per-chain answer cache
+ANSWER_CACHE_SIZE = 256
 
 class KalkiRAGChain:
     """Ultra simple version for testing"""
     
     def __init__(self):
         self.is_initialized = False
+        self.query_processor = QueryProcessor()
+        self.response_formatter = ResponseFormatter()
         self.sample_data = {
             "ramcharitmanas_1": {
                 "hindi": "धर्म की रक्षा करना हमारा कर्तव्य है।",
@@ -21,6 +32,10 @@ class KalkiRAGChain:
                 "collection": "Valmiki Ramayana"
             }
         }
+        
+        # LRU cache of answers keyed by (question, filter, language)
+        self._answer_cache = OrderedDict()
+        self._answer_cache_lock = Lock()
     
     def initialize(self) -> bool:
         """Instant initialization with sample data"""
@@ -42,6 +57,92 @@ class KalkiRAGChain:
         if not self.is_initialized:
             return {"error": "Please initialize system first"}
         
+        cache_key = (question, scripture_filter, language_pref)
+        response = self._get_cached_answer(cache_key)
+        if response is None:
+            response = self._answer(question, scripture_filter)
+            self._cache_answer(cache_key, response)
+        
+        return response
+    
+    async def aask(self, question: str, scripture_filter: str = "All Texts",
+                   language_pref: str = "All Languages") -> Dict[str, Any]:
+        """Async ask: query processing runs concurrently with retrieval"""
+        
+        if not self.is_initialized:
+            return {"error": "Please initialize system first"}
+        
+        cache_key = (question, scripture_filter, language_pref)
+        response = self._get_cached_answer(cache_key)
+        if response is not None:
+            return response
+        
+        # CPU-bound query processing overlaps with the retrieval step
+        answer, processed_query = await asyncio.gather(
+            asyncio.to_thread(self._sample_answer, question),
+            asyncio.to_thread(self.query_processor.process_query, question, scripture_filter)
+        )
+        
+        response = {**answer, "processed_query": processed_query}
+        self._cache_answer(cache_key, response)
+        return response
+    
+    async def ask_batch(self, questions: List[str], scripture_filter: str = "All Texts",
+                        language_pref: str = "All Languages") -> List[Dict[str, Any]]:
+        """Answer several questions concurrently"""
+        return list(await asyncio.gather(
+            *(self.aask(question, scripture_filter, language_pref) for question in questions)
+        ))
+    
+    def stream(self, question: str, scripture_filter: str = "All Texts",
+               language_pref: str = "All Languages") -> Iterator[Union[str, Dict[str, Any]]]:
+        """Yield the answer text in chunks, then the complete response dict"""
+        
+        if not self.is_initialized:
+            yield {"error": "Please initialize system first"}
+            return
+        
+        cache_key = (question, scripture_filter, language_pref)
+        response = self._get_cached_answer(cache_key)
+        
+        if response is None:
+            response = self._answer(question, scripture_filter)
+            
+            # Emit word by word so the UI renders progressively
+            for token in re.split(r'(\s+)', response["response"]):
+                if token:
+                    yield token
+            
+            self._cache_answer(cache_key, response)
+        else:
+            yield response["response"]
+        
+        yield response
+    
+    def _get_cached_answer(self, cache_key):
+        """Return cached answer and mark it as recently used"""
+        with self._answer_cache_lock:
+            response = self._answer_cache.get(cache_key)
+            if response is not None:
+                self._answer_cache.move_to_end(cache_key)
+            return response
+    
+    def _cache_answer(self, cache_key, response: Dict[str, Any]):
+        """Store answer, evicting the least recently used entry when full"""
+        with self._answer_cache_lock:
+            self._answer_cache[cache_key] = response
+            self._answer_cache.move_to_end(cache_key)
+            if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
+    
+    def _answer(self, question: str, scripture_filter: str) -> Dict[str, Any]:
+        """Build the full response, including the processed query"""
+        processed_query = self.query_processor.process_query(question, scripture_filter)
+        return {**self._sample_answer(question), "processed_query": processed_query}
+    
+    def _sample_answer(self, question: str) -> Dict[str, Any]:
+        """Build response from sample data"""
+        
         # INSTANT RESPONSE - NO PROCESSING
         question_lower = question.lower()
         
@@ -105,6 +206,8 @@ These teachings come from sacred texts like Ramcharitmanas and Valmiki Ramayana.
     
     def rebuild_index(self):
         """Test rebuild"""
+        with self._answer_cache_lock:
+            self._answer_cache.clear()
         return True
     
     def get_sample_questions(self):
@@ -8,6 +8,25 @@ from src.utils import setup_logging
 
 logger = setup_logging()
 
+DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+
+# Simple character mapping for common Devanagari characters, applied in one
+# str.translate pass; characters not in the table are kept as is
+TRANSLITERATION_TABLE = str.maketrans({
+    'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
+    'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nja',
+    'ट': 'ta', 'ठ': 'tha', 'ड': 'da', 'ढ': 'dha', 'ण': 'na',
+    'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
+    'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
+    'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va',
+    'श': 'sha', 'ष': 'sha', 'स': 'sa', 'ह': 'ha',
+    'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu',
+    'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
+    'ा': 'aa', 'ि': 'i', 'ी': 'ii', 'ु': 'u', 'ू': 'uu',
+    'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au',
+    '्': '', '।': '.', '॥': '||'
+})
+
 class MultilingualProcessor:
     """Simple multilingual processor for basic text handling"""
     
@@ -16,32 +35,7 @@ class MultilingualProcessor:
         if not text:
             return ""
         
-        # Simple character mapping for common Devanagari characters
-        transliteration_map = {
-            'क': 'ka', 'ख': 'kha', 'ग': 'ga', 'घ': 'gha', 'ङ': 'nga',
-            'च': 'cha', 'छ': 'chha', 'ज': 'ja', 'झ': 'jha', 'ञ': 'nja',
-            'ट': 'ta', 'ठ': 'tha', 'ड': 'da', 'ढ': 'dha', 'ण': 'na',
-            'त': 'ta', 'थ': 'tha', 'द': 'da', 'ध': 'dha', 'न': 'na',
-            'प': 'pa', 'फ': 'pha', 'ब': 'ba', 'भ': 'bha', 'म': 'ma',
-            'य': 'ya', 'र': 'ra', 'ल': 'la', 'व': 'va',
-            'श': 'sha', 'ष': 'sha', 'स': 'sa', 'ह': 'ha',
-            'अ': 'a', 'आ': 'aa', 'इ': 'i', 'ई': 'ii', 'उ': 'u', 'ऊ': 'uu',
-            'ए': 'e', 'ऐ': 'ai', 'ओ': 'o', 'औ': 'au',
-            'ा': 'aa', 'ि': 'i', 'ी': 'ii', 'ु': 'u', 'ू': 'uu',
-            'े': 'e', 'ै': 'ai', 'ो': 'o', 'ौ': 'au',
-            '्': '', '।': '.', '॥': '||'
-        }
-        
-        result = ""
-        for char in text:
-            if char in transliteration_map:
-                result += transliteration_map[char]
-            elif char.isspace() or char in '.,;:!?()-[]{}':
-                result += char
-            else:
-                result += char  # Keep unknown characters as is
-        
-        return result.strip()
+        return text.translate(TRANSLITERATION_TABLE).strip()
 
 class ResponseFormatter:
     """Format LLM responses for beautiful display"""
@@ -143,7 +137,7 @@ class ResponseFormatter:
             elif current_section == "sources" and line:
                 sections["sources_mentioned"].append(line)
             elif current_section == "sanskrit_verses" and line:
-                if re.search(r'[\u0900-\u097F]', line):
+                if DEVANAGARI_RE.search(line):
                     sections["sanskrit_verses"].append({
                         "sanskrit": line,
                         "transliteration": self.multilingual.transliterate_devanagari(line),
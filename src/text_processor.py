@@ -1,7 +1,7 @@
 
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Iterable
 from langdetect import detect
+from src.multilingual import DEVANAGARI_RE
 from src.utils import clean_text, setup_logging
 from config import Config
 
@@ -14,7 +14,7 @@ class TextProcessor:
         self.chunk_size = Config.CHUNK_SIZE
         self.chunk_overlap = Config.CHUNK_OVERLAP
         
-    def process_texts(self, texts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def process_texts(self, texts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process all texts into chunks"""
         processed_chunks = []
         
@@ -101,7 +101,7 @@ class TextProcessor:
                 return 'english'
             else:
                 # Check for Sanskrit/Devanagari
-                if re.search(r'[\u0900-\u097F]', text):
+                if DEVANAGARI_RE.search(text):
                     return 'sanskrit'
                 return 'english'
         except:
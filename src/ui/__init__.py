@@ -0,0 +1,3 @@
+"""
+Shared Streamlit UI components for Kalki GPT
+"""
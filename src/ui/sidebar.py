@@ -0,0 +1,102 @@
+import streamlit as st
+
+SAMPLE_QUESTIONS = [
+    "What does Ramcharitmanas say about devotion?",
+    "Tell me about Hanuman's qualities",
+    "What is dharma according to scriptures?",
+    "Explain the concept of bhakti",
+    "What are the qualities of a good devotee?",
+    "How to overcome difficulties in life?",
+    "What is the importance of guru?",
+    "Tell me about Ram's ideals"
+]
+
+def select_sample_question():
+    """Selectbox callback: ask the chosen sample question"""
+    if st.session_state.sample_question:
+        st.session_state.query = st.session_state.sample_question
+        st.session_state.sample_question = ""
+
+def render_sidebar(rag_chain):
+    """Render sidebar controls and return (language_pref, scripture_filter)"""
+    with st.sidebar:
+        st.markdown('<div class="sidebar-content">', unsafe_allow_html=True)
+
+        st.header("🌐 Language / भाषा")
+        language_options = [
+            "🌍 All Languages", "🇮🇳 Hindi", "🇺🇸 English", 
+            "संस्कृत Sanskrit", "📖 Original Text"
+        ]
+        language_pref = st.selectbox(
+            "Choose response language:",
+            language_options,
+            index=0
+        )
+
+        st.header("📚 Scripture Selection")
+        scripture_options = [
+            "All Texts", "Ramcharitmanas", "Valmiki Ramayana", 
+            "Bhagavad Gita", "Ramayana", "Mahabharata"
+        ]
+        scripture_filter = st.selectbox(
+            "Filter by text:",
+            scripture_options,
+            index=0
+        )
+
+        st.header("⚙️ System Settings")
+
+        # Re-initialize system (initialization normally happens at startup)
+        if st.button("🔄 Initialize System", type="primary"):
+            with st.spinner("Initializing Kalki GPT..."):
+                if rag_chain.initialize():
+                    st.success("✅ System initialized successfully!")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to initialize system")
+
+        # Rebuild index
+        if st.button("🔨 Rebuild Index"):
+            with st.spinner("Rebuilding search index..."):
+                if rag_chain.rebuild_index():
+                    st.success("✅ Index rebuilt successfully!")
+                    st.rerun()
+                else:
+                    st.error("❌ Failed to rebuild index")
+
+        # System stats
+        st.header("📊 System Statistics")
+        stats = rag_chain.get_system_stats()
+
+        if stats.get("status") != "Not initialized":
+            st.markdown(f"""
+            <div class="stats-card">
+                <strong>Total Texts:</strong> {stats.get('total_texts', 0)}<br>
+                <strong>Vector Dimension:</strong> {stats.get('embedding_dimension', 0)}<br>
+                <strong>Collections:</strong> {len(stats.get('collections', {}))}<br>
+                <strong>Status:</strong> ✅ Initialized
+            </div>
+            """, unsafe_allow_html=True)
+
+            # Collection stats
+            collections = stats.get('collections', {})
+            if collections:
+                st.write("**Text Collections:**")
+                for collection, count in collections.items():
+                    st.write(f"- {collection.replace('_', ' ').title()}: {count}")
+        else:
+            st.info("🔄 System not initialized yet. Click 'Initialize System' above.")
+
+        st.markdown('</div>', unsafe_allow_html=True)
+
+        # Sample questions
+        st.header("💡 Sample Questions")
+        st.selectbox(
+            "Pick a question to ask:",
+            [""] + SAMPLE_QUESTIONS,
+            key="sample_question",
+            on_change=select_sample_question,
+            help="Select to ask this question"
+        )
+    
+    return language_pref, scripture_filter
@@ -0,0 +1,24 @@
+import streamlit as st
+from pathlib import Path
+from config import Config
+
+CSS_FILE = Path(__file__).resolve().parent.parent.parent / "static" / "css" / "kalki.css"
+
+@st.cache_data(show_spinner=False)
+def load_css():
+    """Read app stylesheet once per process"""
+    return CSS_FILE.read_text(encoding="utf-8")
+
+def apply_styles():
+    """Inject app stylesheet into the page"""
+    st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
+
+def render_header():
+    """Render the page header banner"""
+    st.markdown(f"""
+    <div class="main-header">
+        <h1>🕉️ {Config.APP_TITLE}</h1>
+        <p style="font-size: 1.2em; margin: 0;">{Config.APP_SUBTITLE}</p>
+        <p style="font-size: 1em; margin: 0.5rem 0 0 0;">{Config.APP_DESCRIPTION}</p>
+    </div>
+    """, unsafe_allow_html=True)
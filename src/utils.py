@@ -3,10 +3,15 @@
 
 import logging
 import os
-import json
 import re
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import orjson
+
+# clean_text runs for every processed text, so its patterns are compiled once here
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.\,\;\:\!\?\-\'\"।॥ॐ\u0900-\u097F]')
+_REPEATED_PUNCT_RE = re.compile(r'([\.\,\।])\1+')
 
 def setup_logging():
     """Setup logging for Streamlit Cloud compatibility"""
@@ -42,16 +47,14 @@ def clean_text(text: str) -> str:
         return ""
     
     # Remove extra whitespaces
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = _WHITESPACE_RE.sub(' ', text.strip())
     
     # Remove special characters but keep basic punctuation and Devanagari
     # Keep: letters, numbers, spaces, basic punctuation, Devanagari script (U+0900-U+097F)
-    text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\'\"।॥ॐ\u0900-\u097F]', ' ', text)
+    text = _SPECIAL_CHARS_RE.sub(' ', text)
     
-    # Remove multiple punctuation marks
-    text = re.sub(r'[\.]{2,}', '.', text)
-    text = re.sub(r'[\,]{2,}', ',', text)
-    text = re.sub(r'[\।]{2,}', '।', text)  # Devanagari danda
+    # Collapse runs of '.', ',' or Devanagari danda in a single pass
+    text = _REPEATED_PUNCT_RE.sub(r'\1', text)
     
     # Final cleanup
     text = text.strip()
@@ -111,33 +114,43 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
     
     return unique_keywords[:max_keywords]
 
+def loads(data) -> Any:
+    """Parse JSON from bytes, str or a memoryview"""
+    return orjson.loads(data)
+
+def dumps(data: Any, indent: bool = False) -> bytes:
+    """Serialize data as UTF-8 JSON bytes, compact unless indent is set"""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(data, default=str, option=option)
+
 def save_json(data: Dict[str, Any], filepath: str) -> bool:
     """Save data as JSON with error handling"""
     try:
         # Create directory if it doesn't exist
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(filepath, 'wb') as f:
+            f.write(dumps(data, indent=True))
         return True
     except Exception as e:
         logging.error(f"Failed to save JSON to {filepath}: {e}")
         return False
 
-def load_json(filepath: str) -> Dict[str, Any]:
-    """Load data from JSON with error handling"""
+def load_json(filepath: str) -> Optional[Any]:
+    """Load data from JSON with error handling, returning None on failure"""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return loads(f.read())
     except FileNotFoundError:
         logging.warning(f"JSON file not found: {filepath}")
-        return {}
-    except json.JSONDecodeError as e:
+        return None
+    except ValueError as e:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
         logging.error(f"Invalid JSON in {filepath}: {e}")
-        return {}
+        return None
     except Exception as e:
         logging.error(f"Failed to load JSON from {filepath}: {e}")
-        return {}
+        return None
 
 def ensure_dir(directory: str) -> bool:
     """Ensure directory exists - Streamlit Cloud compatible"""
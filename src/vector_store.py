@@ -1,14 +1,22 @@
 
+import asyncio
 import faiss
 import numpy as np
 import os
 import pickle
 from typing import List, Dict, Any, Tuple
+from src.embeddings import EmbeddingMatrix, embedding_rows, iter_embedding_blocks
 from src.utils import setup_logging, ensure_dir
 from config import Config
 
 logger = setup_logging()
 
+# Above this many vectors the flat scan gives way to HNSW
+FLAT_INDEX_MAX_VECTORS = 50_000
+
+# Rows sampled to train the 8-bit scalar quantizer's value ranges
+INDEX_TRAIN_ROWS = 32_768
+
 class VectorStore:
     """FAISS-based vector store for similarity search"""
     
@@ -18,20 +26,35 @@ class VectorStore:
         self.embeddings_path = Config.EMBEDDINGS_PATH
         ensure_dir(self.embeddings_path)
     
-    def create_index(self, embeddings: np.ndarray) -> faiss.Index:
-        """Create FAISS index from embeddings"""
-        self.dimension = embeddings.shape[1]
+    def create_index(self, embeddings: EmbeddingMatrix) -> faiss.Index:
+        """Create FAISS index from FP32 or INT8 (QuantizedEmbeddings) embeddings"""
+        num_vectors, self.dimension = embeddings.shape
         
         logger.info(f"Creating FAISS index with dimension: {self.dimension}")
         
-        # Use IndexFlatIP for cosine similarity (with normalized embeddings)
-        self.index = faiss.IndexFlatIP(self.dimension)
-        
-        # Ensure embeddings are normalized for cosine similarity
-        faiss.normalize_L2(embeddings)
+        # Inner product for cosine similarity on normalized embeddings; 8-bit
+        # codes in both cases, 4x less memory and traffic per vector than FP32
+        if num_vectors > FLAT_INDEX_MAX_VECTORS:
+            self.index = faiss.IndexHNSWSQ(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, Config.HNSW_M, faiss.METRIC_INNER_PRODUCT
+            )
+            self.index.hnsw.efConstruction = Config.HNSW_EF_CONSTRUCTION
+            self.index.hnsw.efSearch = Config.HNSW_EF_SEARCH
+        else:
+            self.index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
         
-        # Add embeddings to index
-        self.index.add(embeddings.astype('float32'))
+        # Train on an evenly spaced row sample and add in bounded blocks, so
+        # no FP32 copy of the whole corpus is ever resident
+        train_rows = np.linspace(0, num_vectors - 1, min(num_vectors, INDEX_TRAIN_ROWS), dtype=np.int64)
+        sample = embedding_rows(embeddings, np.unique(train_rows))
+        faiss.normalize_L2(sample)
+        self.index.train(sample)
+        for block in iter_embedding_blocks(embeddings):
+            # Ensure embeddings are normalized for cosine similarity
+            faiss.normalize_L2(block)
+            self.index.add(block)
         
         logger.info(f"Added {self.index.ntotal} vectors to FAISS index")
         return self.index
@@ -57,9 +80,13 @@ class VectorStore:
             if not os.path.exists(index_path):
                 return False
             
-            self.index = faiss.read_index(index_path)
+            # Memory-map the index so cold start does not read it all into RAM
+            self.index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
             self.dimension = self.index.d
             
+            if isinstance(self.index, faiss.IndexHNSW):
+                self.index.hnsw.efSearch = Config.HNSW_EF_SEARCH
+            
             logger.info(f"Loaded FAISS index with {self.index.ntotal} vectors")
             return True
             
@@ -81,6 +108,10 @@ class VectorStore:
         
         return scores, indices
     
+    async def asearch(self, query_embedding: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Search without blocking the event loop (FAISS releases the GIL)"""
+        return await asyncio.to_thread(self.search, query_embedding, k)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get index statistics"""
         if self.index is None: